@@ -4,6 +4,7 @@ Example: Aggregating news from offline sources
 
 import sys
 import os
+import logging
 from pathlib import Path
 
 # Add src to path
@@ -16,6 +17,9 @@ from src.pipeline.aggregator import NewsAggregator
 def main():
     """Example of aggregating news from a directory."""
     
+    # Show pipeline progress and errors (set to DEBUG for per-file steps)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    
     # Initialize database
     print("Initializing database...")
     database = NoSQLDatabase()
@@ -2,34 +2,117 @@
 FastAPI application for news aggregation and search
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 import os
+import random
+import asyncio
+import logging
+import tempfile
 from dotenv import load_dotenv
 
 from ..database.nosql_db import NoSQLDatabase
 from ..pipeline.aggregator import NewsAggregator
+from ..pipeline.jobs import JobQueue
 from ..search.engine import SearchEngine
 from ..vector_db.cache import VectorCache
+from ..vector_db.query_store import QueryStore
 from ..llm.query_improver import LLMQueryImprover
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Blocking component calls (MongoDB, OCR/NER, LLM, ChromaDB) are run in worker
+# threads via asyncio.to_thread so they do not stall the event loop.
+
+# Size of chunks read when streaming uploads to disk (1 MiB)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Fraction of cache hits (of LLM-improved searches) checked against the LLM,
+# after the cached response has been served
+CACHE_HIT_VERIFY_RATE = float(os.getenv("CACHE_HIT_VERIFY_RATE", "0.1"))
+
+# Running cache hit verifications (referenced until done, so they are not
+# garbage collected, and awaited on shutdown)
+_verification_tasks = set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize components on startup and release connections on shutdown."""
+    database = NoSQLDatabase(
+        max_pool_size=int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        min_pool_size=int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+    )
+    query_store = QueryStore()
+    vector_cache = VectorCache(query_store=query_store)
+    
+    app.state.database = database
+    app.state.aggregator = NewsAggregator(database=database)
+    app.state.search_engine = SearchEngine(database=database)
+    app.state.query_store = query_store
+    app.state.vector_cache = vector_cache
+    app.state.llm_improver = LLMQueryImprover(vector_cache=vector_cache, query_store=query_store)
+    # Job status lives in MongoDB so any API worker process can report it
+    app.state.job_queue = JobQueue(
+        max_workers=int(os.getenv("AGGREGATION_WORKERS", "0")) or None,
+        collection=database.db[os.getenv("AGGREGATION_JOBS_COLLECTION", "aggregation_jobs")]
+    )
+    
+    yield
+    
+    if _verification_tasks:
+        await asyncio.gather(*_verification_tasks, return_exceptions=True)
+    app.state.job_queue.shutdown(wait=True)
+    await app.state.llm_improver.aclose()
+    await vector_cache.aclose()
+    database.close()
+    query_store.close()
+
+
 app = FastAPI(
     title="News Aggregation & Search API",
     description="API for aggregating and searching news from offline sources",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Initialize components
-database = NoSQLDatabase()
-aggregator = NewsAggregator(database=database)
-search_engine = SearchEngine(database=database)
-vector_cache = VectorCache()
-llm_improver = LLMQueryImprover(vector_cache=vector_cache)
+
+# Dependencies
+def get_db(request: Request) -> NoSQLDatabase:
+    """Get the application database."""
+    return request.app.state.database
+
+
+def get_aggregator(request: Request) -> NewsAggregator:
+    """Get the application news aggregator."""
+    return request.app.state.aggregator
+
+
+def get_search_engine(request: Request) -> SearchEngine:
+    """Get the application search engine."""
+    return request.app.state.search_engine
+
+
+def get_vector_cache(request: Request) -> VectorCache:
+    """Get the application vector cache."""
+    return request.app.state.vector_cache
+
+
+def get_llm_improver(request: Request) -> LLMQueryImprover:
+    """Get the application LLM query improver."""
+    return request.app.state.llm_improver
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Get the application background job queue."""
+    return request.app.state.job_queue
 
 
 # Request/Response models
@@ -48,6 +131,10 @@ class SearchResponse(BaseModel):
     cached: bool = False
 
 
+class BatchSearchRequest(BaseModel):
+    queries: List[SearchRequest]
+
+
 class AggregateRequest(BaseModel):
     file_path: Optional[str] = None
     directory_path: Optional[str] = None
@@ -61,6 +148,35 @@ class AggregateResponse(BaseModel):
     document_ids: List[str]
 
 
+def _entities_match(entities: Optional[Dict], other: Optional[Dict]) -> bool:
+    """Check whether two entity dictionaries contain the same entities (case-insensitive)."""
+    def normalize(value: Optional[Dict]) -> Dict:
+        return {
+            category: {str(v).lower() for v in values}
+            for category, values in (value or {}).items()
+            if values
+        }
+    
+    return normalize(entities) == normalize(other)
+
+
+def _aggregate_uploaded_file(aggregator: NewsAggregator, temp_path: str, url: Optional[str]) -> Dict:
+    """Aggregate an uploaded file in a background job, removing it afterwards."""
+    try:
+        rectified = aggregator.aggregate_from_file(
+            file_path=temp_path,
+            url=url,
+            filter_low_relevance=True
+        )
+        return {
+            "document_id": rectified.get("_id"),
+            "url": rectified.get("url")
+        }
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -71,6 +187,7 @@ async def root():
         "endpoints": {
             "aggregate": "/aggregate",
             "search": "/search",
+            "search_batch": "/search/batch",
             "health": "/health",
             "stats": "/stats"
         }
@@ -78,10 +195,10 @@ async def root():
 
 
 @app.get("/health")
-async def health():
+async def health(database: NoSQLDatabase = Depends(get_db)):
     """Health check endpoint."""
     try:
-        count = database.count_documents()
+        count = await asyncio.to_thread(database.count_documents)
         return {
             "status": "healthy",
             "database": "connected",
@@ -92,12 +209,12 @@ async def health():
 
 
 @app.get("/stats")
-async def stats():
+async def stats(database: NoSQLDatabase = Depends(get_db)):
     """Get statistics about indexed documents."""
     try:
-        count = database.count_documents()
+        collection_stats = await asyncio.to_thread(database.get_stats)
         return {
-            "total_documents": count,
+            **collection_stats,
             "database": database.db_name,
             "collection": database.collection_name
         }
@@ -106,14 +223,16 @@ async def stats():
 
 
 @app.post("/aggregate", response_model=AggregateResponse)
-async def aggregate_news(request: AggregateRequest):
+async def aggregate_news(request: AggregateRequest,
+                         aggregator: NewsAggregator = Depends(get_aggregator)):
     """
     Aggregate news from files or directories.
     """
     try:
         if request.file_path:
             # Aggregate from single file
-            rectified = aggregator.aggregate_from_file(
+            rectified = await asyncio.to_thread(
+                aggregator.aggregate_from_file,
                 file_path=request.file_path,
                 url=request.url,
                 filter_low_relevance=request.filter_low_relevance
@@ -127,7 +246,8 @@ async def aggregate_news(request: AggregateRequest):
         
         elif request.directory_path:
             # Aggregate from directory
-            results = aggregator.aggregate_from_directory(
+            results = await asyncio.to_thread(
+                aggregator.aggregate_from_directory,
                 directory_path=request.directory_path,
                 filter_low_relevance=request.filter_low_relevance
             )
@@ -148,144 +268,241 @@ async def aggregate_news(request: AggregateRequest):
         raise HTTPException(status_code=500, detail=f"Aggregation failed: {str(e)}")
 
 
-@app.post("/aggregate/upload")
-async def aggregate_upload(file: UploadFile = File(...)):
+@app.post("/aggregate/upload", status_code=202)
+async def aggregate_upload(file: UploadFile = File(...),
+                           aggregator: NewsAggregator = Depends(get_aggregator),
+                           job_queue: JobQueue = Depends(get_job_queue)):
     """
-    Upload and aggregate a file.
+    Upload a file and queue it for aggregation.
+    Poll /aggregate/status/{job_id} for the result.
     """
+    temp_path = None
     try:
-        # Save uploaded file temporarily
-        temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Aggregate
-        rectified = aggregator.aggregate_from_file(
-            file_path=temp_path,
-            url=file.filename,
-            filter_low_relevance=True
-        )
+        # Stream uploaded file to a unique temporary file (keeping the extension
+        # so the file type can be detected)
+        suffix = os.path.splitext(file.filename or "")[1]
+        with tempfile.NamedTemporaryFile(delete=False, dir="/tmp", suffix=suffix) as f:
+            temp_path = f.name
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
         
-        # Clean up
-        os.remove(temp_path)
+        # Aggregate in the background; the job removes the temporary file
+        job_id = job_queue.submit(_aggregate_uploaded_file, aggregator, temp_path, file.filename)
         
         return {
-            "message": "File uploaded and aggregated successfully",
-            "document_id": rectified.get("_id"),
-            "url": rectified.get("url")
+            "message": "File uploaded and queued for aggregation",
+            "job_id": job_id,
+            "url": file.filename
         }
     
     except Exception as e:
+        # Clean up
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
-@app.post("/search", response_model=SearchResponse)
-async def search_news(request: SearchRequest):
+@app.get("/aggregate/status/{job_id}")
+async def aggregate_status(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
     """
-    Search for news articles.
+    Get the status of a queued aggregation job.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+async def _lookup_cached_search(request: SearchRequest,
+                                vector_cache: VectorCache,
+                                llm_improver: LLMQueryImprover) -> Optional[SearchResponse]:
+    """
+    Try to answer a search from the vector cache.
+    
+    Returns:
+        SearchResponse if served from cache, None otherwise
+    """
+    query = request.query
+    
+    cached_result = await vector_cache.afind_similar_query(query, similarity_threshold=0.8)
+    if not cached_result or not cached_result.get("results"):
+        return None
+    
+    # Verify a sample of hits against the LLM's entities for this query in the
+    # background, so the LLM call does not delay the cached response
+    if (request.use_llm_improvement and cached_result.get("query_entities")
+            and random.random() < CACHE_HIT_VERIFY_RATE):
+        task = asyncio.create_task(_verify_cached_search(query, cached_result, vector_cache, llm_improver))
+        _verification_tasks.add(task)
+        task.add_done_callback(_verification_tasks.discard)
+    
+    return SearchResponse(
+        query=query,
+        improved_query=cached_result.get("query"),
+        results=cached_result["results"],
+        result_count=len(cached_result["results"]),
+        cached=True
+    )
+
+
+async def _verify_cached_search(query: str,
+                                cached_result: Dict,
+                                vector_cache: VectorCache,
+                                llm_improver: LLMQueryImprover):
+    """
+    Check a served cache hit against the LLM's entities for the query and feed
+    the outcome back into the per-region similarity thresholds.
     """
     try:
-        query = request.query
-        improved_query = None
-        cached = False
-        
-        # Check cache first
-        cached_result = vector_cache.find_similar_query(query, similarity_threshold=0.8)
-        if cached_result and cached_result.get("results"):
-            cached = True
-            return SearchResponse(
-                query=query,
-                improved_query=cached_result.get("query"),
-                results=cached_result["results"],
-                result_count=len(cached_result["results"]),
-                cached=True
-            )
-        
-        # Use LLM improvement if requested
-        improvement = None
-        query_entities = None
+        improvement = await asyncio.to_thread(llm_improver.improve_query, query, reuse_similar=False)
+        correct = _entities_match(improvement.get("entities"), cached_result["query_entities"])
+        await asyncio.to_thread(vector_cache.record_feedback, query, cached_result["similarity"], correct)
+    except Exception as e:
+        logger.warning("Cache hit verification failed for %r: %s", query, e)
+
+
+async def _run_search(request: SearchRequest,
+                      search_engine: SearchEngine,
+                      vector_cache: VectorCache,
+                      llm_improver: LLMQueryImprover) -> SearchResponse:
+    """Run a search against the database and store the results in the vector cache."""
+    query = request.query
+    improved_query = None
+    query_entities = None
+    
+    # Use LLM improvement if requested
+    if request.use_llm_improvement:
+        improvement = await asyncio.to_thread(llm_improver.improve_query, query)
+        improved_query = improvement.get("improved_query")
+        query_entities = improvement.get("entities", {})
         
-        if request.use_llm_improvement:
-            improvement = llm_improver.improve_query(query)
-            improved_query = improvement.get("improved_query")
-            query_entities = improvement.get("entities", {})
-            
-            # If LLM extracted entities, use them
-            if query_entities and improvement.get("confidence", 0) > 0.5:
-                # Build relevance thresholds for each entity category
-                relevance_thresholds = None
-                if request.relevance_threshold:
-                    relevance_thresholds = {
-                        category: request.relevance_threshold
-                        for category in query_entities.keys()
-                    }
-                
-                results = search_engine.search_with_entities(
-                    query_entities=query_entities,
-                    relevance_thresholds=relevance_thresholds,
-                    limit=request.limit
-                )
-            else:
-                # Fall back to regular search
-                results = search_engine.search(
-                    query=improved_query or query,
-                    relevance_thresholds=None,  # Use default thresholds
-                    limit=request.limit
-                )
-        else:
-            # Regular search - extract entities first to build proper thresholds
-            entities = search_engine.ner_extractor.extract_entities(query)
-            query_params = {k: v for k, v in entities.items() if v}
-            
-            # Build relevance thresholds if provided
+        # If LLM extracted entities, use them
+        if query_entities and improvement.get("confidence", 0) > 0.5:
+            # Build relevance thresholds for each entity category
             relevance_thresholds = None
-            if request.relevance_threshold and query_params:
+            if request.relevance_threshold:
                 relevance_thresholds = {
                     category: request.relevance_threshold
-                    for category in query_params.keys()
+                    for category in query_entities.keys()
                 }
             
-            if query_params:
-                results = search_engine.search_with_entities(
-                    query_entities=query_params,
-                    relevance_thresholds=relevance_thresholds,
-                    limit=request.limit
-                )
-            else:
-                results = []
-        
-        vector_cache.store_query(query, results, query_entities)
+            results = await asyncio.to_thread(
+                search_engine.search_with_entities,
+                query_entities=query_entities,
+                relevance_thresholds=relevance_thresholds,
+                limit=request.limit
+            )
+        else:
+            # Fall back to regular search
+            results = await asyncio.to_thread(
+                search_engine.search,
+                query=improved_query or query,
+                relevance_thresholds=None,  # Use default thresholds
+                limit=request.limit
+            )
+    else:
+        # Regular search - extract entities first to build proper thresholds
+        entities = await asyncio.to_thread(search_engine.extract_query_entities, query)
+        query_params = {k: v for k, v in entities.items() if v}
         
-        # Remove internal MongoDB fields for response
-        clean_results = []
-        for result in results:
-            clean_result = {
-                "url": result.get("url"),
-                "entities": result.get("entities"),
-                "relevance_score": result.get("_relevance_score", 0.0)
+        # Build relevance thresholds if provided
+        relevance_thresholds = None
+        if request.relevance_threshold and query_params:
+            relevance_thresholds = {
+                category: request.relevance_threshold
+                for category in query_params.keys()
             }
-            clean_results.append(clean_result)
         
-        return SearchResponse(
-            query=query,
-            improved_query=improved_query,
-            results=clean_results,
-            result_count=len(clean_results),
-            cached=False
-        )
+        if query_params:
+            results = await asyncio.to_thread(
+                search_engine.search_with_entities,
+                query_entities=query_params,
+                relevance_thresholds=relevance_thresholds,
+                limit=request.limit
+            )
+        else:
+            results = []
+    
+    await asyncio.to_thread(vector_cache.store_query, query, results, query_entities)
+    
+    # Remove internal MongoDB fields for response
+    clean_results = []
+    for result in results:
+        clean_result = {
+            "url": result.get("url"),
+            "entities": result.get("entities"),
+            "relevance_score": result.get("_relevance_score", 0.0)
+        }
+        clean_results.append(clean_result)
+    
+    return SearchResponse(
+        query=query,
+        improved_query=improved_query,
+        results=clean_results,
+        result_count=len(clean_results),
+        cached=False
+    )
+
+
+@app.post("/search", response_model=SearchResponse)
+async def search_news(request: SearchRequest,
+                      search_engine: SearchEngine = Depends(get_search_engine),
+                      vector_cache: VectorCache = Depends(get_vector_cache),
+                      llm_improver: LLMQueryImprover = Depends(get_llm_improver)):
+    """
+    Search for news articles.
+    """
+    try:
+        # Check cache first
+        response = await _lookup_cached_search(request, vector_cache, llm_improver)
+        if response:
+            return response
+        
+        return await _run_search(request, search_engine, vector_cache, llm_improver)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+@app.post("/search/batch", response_model=List[SearchResponse])
+async def search_news_batch(request: BatchSearchRequest,
+                            search_engine: SearchEngine = Depends(get_search_engine),
+                            vector_cache: VectorCache = Depends(get_vector_cache),
+                            llm_improver: LLMQueryImprover = Depends(get_llm_improver)):
+    """
+    Run several searches in one call. Results are returned in request order.
+    """
+    try:
+        # Resolve cache hits first; concurrent lookups share embedding batches
+        lookups = await asyncio.gather(*[
+            _lookup_cached_search(search, vector_cache, llm_improver)
+            for search in request.queries
+        ])
+        
+        # Run the misses concurrently against the database
+        misses = [i for i, response in enumerate(lookups) if response is None]
+        searched = await asyncio.gather(*[
+            _run_search(request.queries[i], search_engine, vector_cache, llm_improver)
+            for i in misses
+        ])
+        
+        responses = list(lookups)
+        for i, response in zip(misses, searched):
+            responses[i] = response
+        return responses
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+
+
 @app.get("/document/{url:path}")
-async def get_document(url: str):
+async def get_document(url: str, database: NoSQLDatabase = Depends(get_db)):
     """
     Get a document by URL.
     """
     try:
-        doc = database.get_by_url(url)
+        doc = await asyncio.to_thread(database.get_by_url, url)
         if not doc:
             raise HTTPException(status_code=404, detail="Document not found")
         
@@ -300,12 +517,12 @@ async def get_document(url: str):
 
 
 @app.delete("/document/{url:path}")
-async def delete_document(url: str):
+async def delete_document(url: str, database: NoSQLDatabase = Depends(get_db)):
     """
     Delete a document by URL.
     """
     try:
-        deleted = database.delete_by_url(url)
+        deleted = await asyncio.to_thread(database.delete_by_url, url)
         if not deleted:
             raise HTTPException(status_code=404, detail="Document not found")
         
@@ -2,12 +2,39 @@
 NoSQL Database interface for storing and searching rectified news articles
 """
 
-from typing import Dict, List, Optional, Any
-from pymongo import MongoClient
+from typing import Dict, List, Optional, Any, Tuple
+from pymongo import MongoClient, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
+from ..utils.cache import TTLCache, cached, freeze
+
+
+# Splits lowercased entity keys and search terms into word tokens
+TOKEN_SPLIT_PATTERN = re.compile(r"\W+")
+
+# Characters that turn a search term into a wildcard pattern
+WILDCARD_CHARS = "*?"
+
+
+@lru_cache(maxsize=4096)
+def _tokenize(text: str) -> Tuple[str, ...]:
+    """Split lowercased text into word tokens."""
+    return tuple(token for token in TOKEN_SPLIT_PATTERN.split(text) if token)
+
+
+@lru_cache(maxsize=4096)
+def _wildcard_regex(term: str) -> str:
+    """Convert a lowercased search term with `*`/`?` wildcards into an anchored regex."""
+    pattern = "".join(
+        ".*" if char == "*" else "." if char == "?" else re.escape(char)
+        for char in term
+    )
+    return f"^{pattern}"
 
 
 class NoSQLDatabase:
@@ -16,10 +43,24 @@ class NoSQLDatabase:
     Stores rectified documents with weighted entities.
     """
     
+    # Maximum number of upserts sent per bulk_write command
+    BULK_WRITE_BATCH_SIZE = 1000
+    
+    # Entity categories stored on rectified documents
+    ENTITY_CATEGORIES = ["people", "locations", "dates", "countries", "places", "events"]
+    
+    # Search fields added at ingest that are not returned to callers
+    INTERNAL_FIELDS = ["search_blob", "all_entity_keys_lc", "all_entity_tokens", "all_entity_values"]
+    INTERNAL_ENTITY_FIELDS = ["key_lc", "tokens"]
+    
     def __init__(self, 
                  mongodb_uri: Optional[str] = None,
                  db_name: Optional[str] = None,
-                 collection_name: str = "news_articles"):
+                 collection_name: str = "news_articles",
+                 cache_size: int = 1024,
+                 cache_ttl_seconds: int = 30,
+                 max_pool_size: int = 50,
+                 min_pool_size: int = 5):
         """
         Initialize NoSQL database connection.
         
@@ -27,16 +68,35 @@ class NoSQLDatabase:
             mongodb_uri: MongoDB connection URI (defaults to env var or localhost)
             db_name: Database name (defaults to env var or 'news_aggregation')
             collection_name: Collection name for news articles
+            cache_size: Maximum number of entries in each in-process read cache
+            cache_ttl_seconds: Time-to-live for cached reads in seconds
+            max_pool_size: Maximum number of pooled MongoDB connections
+            min_pool_size: Minimum number of pooled MongoDB connections kept open
         """
         self.mongodb_uri = mongodb_uri or os.getenv("MONGODB_URI", "mongodb://localhost:27017")
         self.db_name = db_name or os.getenv("MONGODB_DB_NAME", "news_aggregation")
         self.collection_name = collection_name
         
-        # Connect to MongoDB
-        self.client = MongoClient(self.mongodb_uri)
+        # Connect to MongoDB (bounded connection pool, fail fast when saturated
+        # or unreachable, zstd wire compression)
+        self.client = MongoClient(
+            self.mongodb_uri,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            waitQueueTimeoutMS=2000,
+            serverSelectionTimeoutMS=2000,
+            compressors="zstd"
+        )
         self.db: Database = self.client[self.db_name]
         self.collection: Collection = self.db[self.collection_name]
         
+        # In-process read caches: documents by URL, and counts/search results
+        # (invalidated on every write)
+        cache_ttl = int(os.getenv("DB_CACHE_TTL", str(cache_ttl_seconds)))
+        self._document_cache = TTLCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        self._query_cache = TTLCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        self._entity_array_cache = TTLCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        
         # Create indexes for efficient searching
         self._create_indexes()
     
@@ -45,16 +105,73 @@ class NoSQLDatabase:
         # Index on URL for uniqueness
         self.collection.create_index("url", unique=True)
         
-        # Index on entity keys for search
-        self.collection.create_index("entities.people.key")
-        self.collection.create_index("entities.locations.key")
-        self.collection.create_index("entities.dates.key")
-        self.collection.create_index("entities.countries.key")
-        self.collection.create_index("entities.places.key")
-        self.collection.create_index("entities.events.key")
+        # Compound index on lowercased entity key, value and URL for search
+        # (serves exact and prefix key lookups and relevance threshold filters,
+        # and covers URL-only projections)
+        # and multikey index on entity key tokens for word lookups
+        for category in self.ENTITY_CATEGORIES:
+            self.collection.create_index([
+                (f"entities.{category}.key_lc", 1),
+                (f"entities.{category}.value", -1),
+                ("url", 1)
+            ])
+            self.collection.create_index(f"entities.{category}.tokens")
+        
+        # Multikey indexes on keys and tokens across all categories
+        # (used when all categories share the same relevance threshold)
+        self.collection.create_index("all_entity_keys_lc")
+        self.collection.create_index("all_entity_tokens")
+        
+        existing_indexes = self.collection.index_information()
+        
+        # Drop entity key indexes superseded by the compound key_lc indexes
+        # (every index slows down writes)
+        for category in self.ENTITY_CATEGORIES:
+            for legacy_index in (
+                f"entities.{category}.key_1",
+                f"entities.{category}.key_1_entities.{category}.value_1",
+                f"entities.{category}.key_lc_1_entities.{category}.value_1"
+            ):
+                if legacy_index in existing_indexes:
+                    self.collection.drop_index(legacy_index)
+        
+        # Text index for full-text search (only one text index is allowed per
+        # collection, so replace a previous one over different fields)
+        text_index = [("url", "text"), ("search_blob", "text")]
+        text_fields = {field for field, _ in text_index}
+        for name, info in existing_indexes.items():
+            if "weights" in info and set(info["weights"]) != text_fields:
+                self.collection.drop_index(name)
+        self.collection.create_index(text_index)
         
-        # Text index for full-text search
-        self.collection.create_index([("url", "text")])
+        # Documents indexed before the search fields existed are not matched by
+        # search until they have them
+        self._backfill_search_fields()
+    
+    def _backfill_search_fields(self) -> int:
+        """
+        Add the search fields to documents indexed without them, in bulk updates.
+        
+        Returns:
+            Number of documents updated
+        """
+        missing_fields = {"$or": [{field: {"$exists": False}} for field in self.INTERNAL_FIELDS]}
+        cursor = self.collection.find(missing_fields, {"entities": 1}, batch_size=self.BULK_WRITE_BATCH_SIZE)
+        
+        updated = 0
+        ops = []
+        for doc in cursor:
+            ops.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": self._search_fields(doc.get("entities", {}))}
+            ))
+            if len(ops) == self.BULK_WRITE_BATCH_SIZE:
+                updated += self.collection.bulk_write(ops, ordered=False).modified_count
+                ops = []
+        if ops:
+            updated += self.collection.bulk_write(ops, ordered=False).modified_count
+        
+        return updated
     
     def index_document(self, rectified_doc: Dict) -> str:
         """
@@ -66,41 +183,150 @@ class NoSQLDatabase:
         Returns:
             Document ID
         """
-        # Add timestamp
-        doc = {
-            **rectified_doc,
-            "indexed_at": datetime.utcnow()
-        }
-        
         # Upsert based on URL
         result = self.collection.update_one(
             {"url": rectified_doc["url"]},
-            {"$set": doc},
+            {"$set": self._prepare_document(rectified_doc)},
             upsert=True
         )
+        self._invalidate(rectified_doc["url"])
         
         return str(result.upserted_id) if result.upserted_id else "updated"
     
+    def _prepare_document(self, rectified_doc: Dict) -> Dict:
+        """Add timestamp, lowercased entity keys and cross-category search fields to a rectified document."""
+        return {
+            **rectified_doc,
+            **self._search_fields(rectified_doc.get("entities", {})),
+            "indexed_at": datetime.utcnow()
+        }
+    
+    def _search_fields(self, entities: Dict[str, List[Dict]]) -> Dict:
+        """
+        Compute the search fields of a document from its weighted entities.
+        
+        Args:
+            entities: Weighted entities by category
+            
+        Returns:
+            Dictionary with the entities (with `key_lc` and `tokens`) and the
+            cross-category search fields
+        """
+        entities = self._with_search_fields(entities)
+        all_entities = [
+            entity
+            for entity_list in entities.values()
+            for entity in entity_list
+        ]
+        return {
+            "entities": entities,
+            "search_blob": " ".join(entity["key_lc"] for entity in all_entities),
+            "all_entity_keys_lc": [entity["key_lc"] for entity in all_entities],
+            "all_entity_tokens": sorted({
+                token
+                for entity in all_entities
+                for token in entity["tokens"]
+            }),
+            "all_entity_values": [entity.get("value", 0.0) for entity in all_entities]
+        }
+    
+    def _with_search_fields(self, entities: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Copy entities, adding the lowercased key (`key_lc`) and its word tokens (`tokens`).
+        
+        Args:
+            entities: Weighted entities by category
+            
+        Returns:
+            Entities with `key_lc` and `tokens` added to every entity
+        """
+        search_entities = {}
+        for category, entity_list in entities.items():
+            search_entities[category] = []
+            for entity in entity_list:
+                key_lc = entity.get("key", "").lower()
+                search_entities[category].append({
+                    **entity,
+                    "key_lc": key_lc,
+                    "tokens": list(_tokenize(key_lc))
+                })
+        return search_entities
+    
+    def _lowercase_terms(self, query_params: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Lowercase all search terms once so query building and scoring can reuse them."""
+        return {
+            category: [term.lower() for term in search_terms]
+            for category, search_terms in query_params.items()
+        }
+    
+    def _invalidate(self, url: str):
+        """Invalidate cached reads affected by a write to the given URL."""
+        self._document_cache.pop(url)
+        self._query_cache.clear()
+        self._entity_array_cache.clear()
+    
+    def _internal_fields(self) -> List[str]:
+        """Get paths of internal entity fields that are not returned to callers."""
+        return self.INTERNAL_FIELDS + [
+            f"entities.{category}.{field}"
+            for category in self.ENTITY_CATEGORIES
+            for field in self.INTERNAL_ENTITY_FIELDS
+        ]
+    
+    def _strip_internal_fields(self, doc: Dict) -> Dict:
+        """Remove internal entity fields from a document returned by the database."""
+        for field in self.INTERNAL_FIELDS:
+            doc.pop(field, None)
+        for entity_list in doc.get("entities", {}).values():
+            for entity in entity_list:
+                for field in self.INTERNAL_ENTITY_FIELDS:
+                    entity.pop(field, None)
+        return doc
+    
     def index_documents(self, rectified_docs: List[Dict]) -> List[str]:
         """
-        Index multiple rectified documents.
+        Index multiple rectified documents using unordered bulk upserts.
         
         Args:
             rectified_docs: List of rectified documents
             
         Returns:
-            List of document IDs
+            List of document IDs (in input order)
         """
         ids = []
+        batch_size = self.BULK_WRITE_BATCH_SIZE
+        
+        for start in range(0, len(rectified_docs), batch_size):
+            batch = rectified_docs[start:start + batch_size]
+            ops = [
+                UpdateOne(
+                    {"url": doc["url"]},
+                    {"$set": self._prepare_document(doc)},
+                    upsert=True
+                )
+                for doc in batch
+            ]
+            result = self.collection.bulk_write(ops, ordered=False)
+            
+            # upserted_ids maps operation index to the new document ID
+            for i in range(len(batch)):
+                upserted_id = result.upserted_ids.get(i)
+                ids.append(str(upserted_id) if upserted_id else "updated")
+        
         for doc in rectified_docs:
-            ids.append(self.index_document(doc))
+            self._invalidate(doc["url"])
+        
         return ids
     
+    @cached("_query_cache", key=lambda self, query_params, relevance_thresholds=None, limit=10, sort_by_relevance=True, full_text=False: (
+        "search", freeze(query_params), freeze(relevance_thresholds), limit, sort_by_relevance, full_text
+    ))
     def search(self, 
                query_params: Dict[str, List[str]],
                relevance_thresholds: Optional[Dict[str, float]] = None,
                limit: int = 10,
-               sort_by_relevance: bool = True) -> List[Dict]:
+               sort_by_relevance: bool = True,
+               full_text: bool = False) -> List[Dict]:
         """
         Search for documents matching entity query parameters.
         
@@ -109,6 +335,8 @@ class NoSQLDatabase:
             relevance_thresholds: Optional dictionary mapping entity categories to minimum relevance scores
             limit: Maximum number of results to return
             sort_by_relevance: Whether to sort results by relevance score
+            full_text: Whether to match terms anywhere in entity keys via the text index
+                       (default matches entity keys by exact value or prefix)
             
         Returns:
             List of matching documents with relevance scores
@@ -116,41 +344,110 @@ class NoSQLDatabase:
         if relevance_thresholds is None:
             relevance_thresholds = {}
         
-        # Build MongoDB query
-        query = self._build_query(query_params, relevance_thresholds)
+        query_params = self._lowercase_terms(query_params)
         
-        # Execute query
-        cursor = self.collection.find(query)
+        # Build MongoDB query
+        if full_text:
+            query = self._build_text_query(query_params, relevance_thresholds)
+        else:
+            query = self._build_query(query_params, relevance_thresholds)
         
-        # Calculate relevance scores and sort
-        results = []
-        for doc in cursor:
-            score = self._calculate_relevance_score(doc, query_params, relevance_thresholds)
-            doc["_relevance_score"] = score
-            results.append(doc)
+        if not sort_by_relevance:
+            # No ranking needed: fetch only the first `limit` matches
+            # (in a single batch) and score them locally
+            results = []
+            projection = {"url": 1, "entities": 1, "_id": 0}
+            cursor = self.collection.find(query, projection).limit(limit).batch_size(limit)
+            for doc in cursor:
+                doc["_relevance_score"] = self._calculate_relevance_score(
+                    doc, query_params, relevance_thresholds
+                )
+                results.append(self._strip_internal_fields(doc))
+            return results
         
-        # Sort by relevance if requested
-        if sort_by_relevance:
-            results.sort(key=lambda x: x["_relevance_score"], reverse=True)
+        # Score, sort and limit server-side so only the top results are returned;
+        # $sort followed by $limit keeps a top-k heap instead of sorting every match
+        score_fields = {"_relevance_score": self._build_score_expression(query_params)}
+        sort_order = {"_relevance_score": -1}
+        if full_text:
+            # Break ties with the text index score
+            score_fields["_text_score"] = {"$meta": "textScore"}
+            sort_order["_text_score"] = -1
         
-        # Limit results
-        results = results[:limit]
+        pipeline = [
+            {"$match": query},
+            {"$addFields": score_fields},
+            {"$sort": sort_order},
+            {"$limit": limit},
+            {"$project": {
+                "_id": 0,
+                "url": 1,
+                "entities": 1,
+                "indexed_at": 1,
+                "_relevance_score": 1,
+                "_text_score": 1
+            }},
+            {"$unset": self._internal_fields()}
+        ]
         
-        return results
+        # Return the top results in the first batch (no getMore round trips)
+        return list(self.collection.aggregate(pipeline, allowDiskUse=False, batchSize=limit))
     
     def _build_query(self, 
                     query_params: Dict[str, List[str]],
-                    relevance_thresholds: Dict[str, float]) -> Dict:
+                    relevance_thresholds: Dict[str, float],
+                    scoring: bool = True) -> Dict:
         """
         Build MongoDB query from entity search parameters.
         
+        Exact (lowercased) key matches and relevance thresholds are expressed as
+        indexable filters. Word token matches (or anchored patterns for terms with
+        wildcards) are only added for scoring queries.
+        
         Args:
-            query_params: Entity search parameters
+            query_params: Entity search parameters (lowercased terms)
             relevance_thresholds: Relevance thresholds per category
+            scoring: Whether to include token matches (False returns a pure filter)
             
         Returns:
             MongoDB query dictionary
         """
+        query = self._build_category_query(query_params, relevance_thresholds, scoring)
+        if not query:
+            return {}
+        
+        # Same threshold for every queried category: narrow the candidates with the
+        # cross-category key and token arrays first (a single multikey index lookup);
+        # the per-category query still decides which category each term must match
+        thresholds = {
+            relevance_thresholds.get(category, 0.0)
+            for category, search_terms in query_params.items()
+            if search_terms
+        }
+        if len(thresholds) == 1:
+            return {"$and": [
+                self._build_uniform_query(query_params, thresholds.pop(), scoring),
+                query
+            ]}
+        
+        return query
+    
+    def _build_category_query(self,
+                              query_params: Dict[str, List[str]],
+                              relevance_thresholds: Dict[str, float],
+                              scoring: bool = True) -> Dict:
+        """
+        Build an `$or` over the queried categories, each restricted to its own
+        entity keys/tokens and relevance threshold.
+        
+        Args:
+            query_params: Entity search parameters (lowercased terms)
+            relevance_thresholds: Relevance thresholds per category
+            scoring: Whether to include token matches (False returns a pure filter)
+            
+        Returns:
+            MongoDB query dictionary (empty if no category has search terms)
+        """
         query = {"$or": []}
         
         # For each entity category
@@ -160,23 +457,33 @@ class NoSQLDatabase:
             
             category_path = f"entities.{category}"
             threshold = relevance_thresholds.get(category, 0.0)
-            
             # Build query for this category
             category_query = {
                 "$and": []
             }
             
-            # Match any of the search terms
-            term_conditions = []
-            for term in search_terms:
-                term_lower = term.lower()
-                # Match entity key (case-insensitive)
-                term_conditions.append({
-                    f"{category_path}.key": {"$regex": term_lower, "$options": "i"}
-                })
+            # Exact match on lowercased key (index equality lookup)
+            term_conditions = [{
+                f"{category_path}.key_lc": {"$in": search_terms}
+            }]
             
-            if term_conditions:
-                category_query["$and"].append({"$or": term_conditions})
+            if scoring:
+                for term in search_terms:
+                    if any(char in term for char in WILDCARD_CHARS):
+                        # Wildcard pattern on lowercased key (anchored, index range scan)
+                        term_conditions.append({
+                            f"{category_path}.key_lc": {"$regex": _wildcard_regex(term)}
+                        })
+                        continue
+                    
+                    # Word match on key tokens (multikey index lookup)
+                    tokens = _tokenize(term)
+                    if len(tokens) == 1:
+                        term_conditions.append({f"{category_path}.tokens": tokens[0]})
+                    elif tokens:
+                        term_conditions.append({f"{category_path}.tokens": {"$all": list(tokens)}})
+            
+            category_query["$and"].append({"$or": term_conditions})
             
             # Apply relevance threshold if specified
             if threshold > 0:
@@ -184,8 +491,7 @@ class NoSQLDatabase:
                     f"{category_path}.value": {"$gte": threshold}
                 })
             
-            if category_query["$and"]:
-                query["$or"].append(category_query)
+            query["$or"].append(category_query)
         
         # If no conditions, return empty query (no results)
         if not query["$or"]:
@@ -193,6 +499,172 @@ class NoSQLDatabase:
         
         return query
     
+    def _build_uniform_query(self,
+                             query_params: Dict[str, List[str]],
+                             threshold: float,
+                             scoring: bool = True) -> Dict:
+        """
+        Build a candidate filter for a threshold shared by all queried categories,
+        matching against the cross-category key and token arrays.
+        
+        This filter ignores categories (a person term would match a location key),
+        so it is only used together with the per-category query.
+        
+        Args:
+            query_params: Entity search parameters (lowercased terms)
+            threshold: Relevance threshold shared by all categories
+            scoring: Whether to include token matches (False returns a pure filter)
+            
+        Returns:
+            MongoDB query dictionary
+        """
+        terms = list(dict.fromkeys(
+            term
+            for search_terms in query_params.values()
+            for term in search_terms
+        ))
+        
+        # Exact match on lowercased keys (single multikey index lookup)
+        term_conditions = [{"all_entity_keys_lc": {"$in": terms}}]
+        
+        if scoring:
+            single_tokens = []
+            for term in terms:
+                if any(char in term for char in WILDCARD_CHARS):
+                    term_conditions.append({
+                        "all_entity_keys_lc": {"$regex": _wildcard_regex(term)}
+                    })
+                    continue
+                
+                tokens = _tokenize(term)
+                if len(tokens) == 1:
+                    single_tokens.append(tokens[0])
+                elif tokens:
+                    term_conditions.append({"all_entity_tokens": {"$all": list(tokens)}})
+            
+            if single_tokens:
+                term_conditions.append({"all_entity_tokens": {"$in": single_tokens}})
+        
+        query = term_conditions[0] if len(term_conditions) == 1 else {"$or": term_conditions}
+        
+        # Apply relevance threshold if specified
+        if threshold > 0:
+            query = {"$and": [
+                query,
+                {"$expr": {"$gte": [{"$max": "$all_entity_values"}, threshold]}}
+            ]}
+        
+        return query
+    
+    def _build_text_query(self,
+                          query_params: Dict[str, List[str]],
+                          relevance_thresholds: Dict[str, float]) -> Dict:
+        """
+        Build a full-text MongoDB query matching search terms anywhere in entity keys.
+        
+        Args:
+            query_params: Entity search parameters (lowercased terms)
+            relevance_thresholds: Relevance thresholds per category
+            
+        Returns:
+            MongoDB query dictionary
+        """
+        terms = [
+            term
+            for search_terms in query_params.values()
+            for term in search_terms
+        ]
+        if not terms:
+            return {}
+        
+        query = {"$text": {"$search": " ".join(terms)}}
+        
+        # Require at least one queried category to meet its threshold
+        threshold_conditions = [
+            {f"entities.{category}.value": {"$gte": relevance_thresholds[category]}}
+            for category, search_terms in query_params.items()
+            if search_terms and relevance_thresholds.get(category, 0.0) > 0
+        ]
+        if threshold_conditions:
+            query = {"$and": [query, {"$or": threshold_conditions}]}
+        
+        return query
+    
+    def _build_score_expression(self, query_params: Dict[str, List[str]]) -> Dict:
+        """
+        Build an aggregation expression computing the relevance score server-side.
+        Mirrors _calculate_relevance_score.
+        
+        Args:
+            query_params: Query parameters (lowercased terms)
+            
+        Returns:
+            Aggregation expression evaluating to the relevance score (0.0 to 1.0)
+        """
+        weighted_scores = []
+        total_weight = 0
+        
+        for category, search_terms in query_params.items():
+            if not search_terms:
+                continue
+            
+            # Number of search terms matched by the current entity
+            # (term contained in key or key contained in term)
+            term_hits = {"$add": [
+                {"$cond": [
+                    {"$or": [
+                        {"$gte": [{"$indexOfCP": ["$$key", term]}, 0]},
+                        {"$gte": [{"$indexOfCP": [term, "$$key"]}, 0]}
+                    ]},
+                    1,
+                    0
+                ]}
+                for term in search_terms
+            ]}
+            
+            # Sum matched entity values and match counts over the category
+            category_totals = {"$reduce": {
+                "input": {"$ifNull": [f"$entities.{category}", []]},
+                "initialValue": {"score": 0.0, "matches": 0},
+                "in": {"$let": {
+                    "vars": {"key": {"$ifNull": [
+                        "$$this.key_lc",
+                        {"$toLower": {"$ifNull": ["$$this.key", ""]}}
+                    ]}},
+                    "in": {"$let": {
+                        "vars": {"hits": term_hits},
+                        "in": {
+                            "score": {"$add": [
+                                "$$value.score",
+                                {"$multiply": ["$$hits", {"$ifNull": ["$$this.value", 0.0]}]}
+                            ]},
+                            "matches": {"$add": ["$$value.matches", "$$hits"]}
+                        }
+                    }}
+                }}
+            }}
+            
+            # Average score for this category, weighted by number of search terms
+            weight = len(search_terms)
+            weighted_scores.append({"$let": {
+                "vars": {"totals": category_totals},
+                "in": {"$multiply": [
+                    {"$cond": [
+                        {"$gt": ["$$totals.matches", 0]},
+                        {"$divide": ["$$totals.score", "$$totals.matches"]},
+                        0.0
+                    ]},
+                    weight
+                ]}
+            }})
+            total_weight += weight
+        
+        # Normalize to 0-1 range
+        if total_weight == 0:
+            return {"$literal": 0.0}
+        
+        return {"$round": [{"$divide": [{"$add": weighted_scores}, total_weight]}, 3]}
+    
     def _calculate_relevance_score(self,
                                    doc: Dict,
                                    query_params: Dict[str, List[str]],
@@ -202,7 +674,7 @@ class NoSQLDatabase:
         
         Args:
             doc: Document from database
-            query_params: Query parameters
+            query_params: Query parameters (lowercased terms)
             relevance_thresholds: Relevance thresholds
             
         Returns:
@@ -211,28 +683,21 @@ class NoSQLDatabase:
         total_score = 0.0
         total_weight = 0.0
         
-        entities = doc.get("entities", {})
-        
         # Score each category
         for category, search_terms in query_params.items():
             if not search_terms:
                 continue
             
-            category_entities = entities.get(category, [])
-            
-            # Find matching entities and sum their scores
-            category_score = 0.0
-            matches = 0
+            keys_lc, values = self._entity_arrays(doc, category)
             
+            # Count matching search terms per entity (term contained in key
+            # or key contained in term) and sum the matched entity scores
+            hits = np.zeros(len(keys_lc), dtype=np.int64)
             for term in search_terms:
-                term_lower = term.lower()
-                for entity in category_entities:
-                    entity_key = entity.get("key", "").lower()
-                    entity_value = entity.get("value", 0.0)
-                    
-                    if term_lower in entity_key or entity_key in term_lower:
-                        category_score += entity_value
-                        matches += 1
+                hits += (np.char.find(keys_lc, term) >= 0) | (np.char.find(term, keys_lc) >= 0)
+            
+            category_score = float(np.dot(hits, values))
+            matches = int(hits.sum())
             
             # Average score for this category
             if matches > 0:
@@ -253,6 +718,38 @@ class NoSQLDatabase:
         
         return round(final_score, 3)
     
+    def _entity_arrays(self, doc: Dict, category: str) -> tuple:
+        """
+        Get lowercased entity keys and entity values of a document category as arrays.
+        Memoized per document URL.
+        
+        Args:
+            doc: Document from database
+            category: Entity category
+            
+        Returns:
+            Tuple of (lowercased keys array, values array)
+        """
+        cache_key = (doc["url"], category) if "url" in doc else None
+        if cache_key is not None:
+            arrays = self._entity_array_cache.get(cache_key)
+            if arrays is not None:
+                return arrays
+        
+        category_entities = doc.get("entities", {}).get(category, [])
+        arrays = (
+            np.array([
+                entity.get("key_lc", entity.get("key", "").lower())
+                for entity in category_entities
+            ], dtype=str),
+            np.array([entity.get("value", 0.0) for entity in category_entities], dtype=np.float64)
+        )
+        
+        if cache_key is not None:
+            self._entity_array_cache.set(cache_key, arrays)
+        return arrays
+    
+    @cached("_document_cache", key=lambda self, url: url)
     def get_by_url(self, url: str) -> Optional[Dict]:
         """
         Retrieve a document by URL.
@@ -263,7 +760,8 @@ class NoSQLDatabase:
         Returns:
             Document if found, None otherwise
         """
-        return self.collection.find_one({"url": url})
+        projection = {field: 0 for field in self._internal_fields()}
+        return self.collection.find_one({"url": url}, projection)
     
     def delete_by_url(self, url: str) -> bool:
         """
@@ -276,11 +774,69 @@ class NoSQLDatabase:
             True if deleted, False if not found
         """
         result = self.collection.delete_one({"url": url})
+        self._invalidate(url)
         return result.deleted_count > 0
     
-    def count_documents(self) -> int:
-        """Get total number of indexed documents."""
-        return self.collection.count_documents({})
+    @cached("_query_cache", key=lambda self, query_params=None, relevance_thresholds=None: (
+        "__count__" if not query_params
+        else ("count", freeze(query_params), freeze(relevance_thresholds))
+    ))
+    def count_documents(self,
+                        query_params: Optional[Dict[str, List[str]]] = None,
+                        relevance_thresholds: Optional[Dict[str, float]] = None) -> int:
+        """
+        Get number of indexed documents.
+        
+        Args:
+            query_params: Optional entity parameters; only exact key matches are counted
+            relevance_thresholds: Optional relevance thresholds per category
+            
+        Returns:
+            Total document count, or count of documents matching the filter
+        """
+        if not query_params:
+            return self.collection.count_documents({})
+        
+        query = self._build_query(
+            self._lowercase_terms(query_params), relevance_thresholds or {}, scoring=False
+        )
+        if not query:
+            return 0
+        return self.collection.count_documents(query)
+    
+    @cached("_query_cache", key=lambda self: "__stats__")
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get collection statistics in a single round trip ($facet).
+        
+        Returns:
+            Dictionary with total document count and entity counts per category
+        """
+        pipeline = [{"$facet": {
+            "total": [{"$count": "n"}],
+            "by_category": [
+                {"$project": {
+                    category: {"$size": {"$ifNull": [f"$entities.{category}", []]}}
+                    for category in self.ENTITY_CATEGORIES
+                }},
+                {"$group": {
+                    "_id": None,
+                    **{category: {"$sum": f"${category}"} for category in self.ENTITY_CATEGORIES}
+                }}
+            ]
+        }}]
+        
+        facets = next(self.collection.aggregate(pipeline), {})
+        total = facets.get("total") or [{"n": 0}]
+        by_category = facets.get("by_category") or [{}]
+        
+        return {
+            "total_documents": total[0]["n"],
+            "entities_by_category": {
+                category: by_category[0].get(category, 0)
+                for category in self.ENTITY_CATEGORIES
+            }
+        }
     
     def close(self):
         """Close database connection."""
@@ -3,9 +3,28 @@ LLM-based query improvement for vague or low-quality search queries
 """
 
 import os
+import re
+import json
+import asyncio
+import logging
+import functools
 from typing import Optional, Dict, List
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from ..vector_db.cache import VectorCache
+from ..vector_db.query_store import QueryStore
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Outermost JSON object in an LLM response
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
 
 
 class LLMQueryImprover:
@@ -14,10 +33,15 @@ class LLMQueryImprover:
     by extracting better search terms and entities.
     """
     
+    # Cached queries at least this similar are reused without calling the LLM
+    NEAR_DUPLICATE_SIMILARITY = 0.95
+    
     def __init__(self,
                  api_key: Optional[str] = None,
                  model: str = "gpt-3.5-turbo",
-                 vector_cache: Optional[VectorCache] = None):
+                 vector_cache: Optional[VectorCache] = None,
+                 query_store: Optional[QueryStore] = None,
+                 completion_cache_size: int = 4096):
         """
         Initialize LLM query improver.
         
@@ -25,33 +49,54 @@ class LLMQueryImprover:
             api_key: OpenAI API key (defaults to env var)
             model: OpenAI model to use
             vector_cache: Vector cache for retrieving context from previous queries
+            query_store: Persistent store for memoizing improvements across restarts
+            completion_cache_size: Number of LLM completions memoized in memory by prompt
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        # Pooled HTTP/2 clients reuse connections across calls
+        limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        self._http = httpx.Client(http2=True, limits=limits, timeout=30.0)
+        self._ahttp = httpx.AsyncClient(http2=True, limits=limits, timeout=30.0)
+        self.client = OpenAI(api_key=self.api_key, http_client=self._http)
+        self.aclient = AsyncOpenAI(api_key=self.api_key, http_client=self._ahttp)
         self.model = model
         self.vector_cache = vector_cache
+        self.query_store = query_store
+        
+        # Identical prompts reuse the completion instead of another API round trip
+        self._call_llm = functools.lru_cache(maxsize=completion_cache_size)(self._complete)
     
     def improve_query(self,
                      query: str,
-                     use_context: bool = True) -> Dict[str, any]:
+                     use_context: bool = True,
+                     reuse_similar: bool = True) -> Dict[str, any]:
         """
         Improve a search query using LLM.
         
         Args:
             query: Original search query
             use_context: Whether to use context from previous similar queries
+            reuse_similar: Whether to return the entities of a near-duplicate cached
+                           query without calling the LLM
             
         Returns:
             Dictionary with improved query and extracted entities
         """
+        # Reuse a persisted improvement for this (normalized) query and model
+        stored = self._get_stored_improvement(query)
+        if stored is not None:
+            return stored
+        
         # Get context from similar queries if available
         context = None
         if use_context and self.vector_cache:
             similar_query = self.vector_cache.find_similar_query(query, similarity_threshold=0.7)
             if similar_query and similar_query.get("query_entities"):
+                if reuse_similar and similar_query["similarity"] >= self.NEAR_DUPLICATE_SIMILARITY:
+                    return self._reuse_similar(query, similar_query)
                 context = similar_query["query_entities"]
         
         # Build prompt
@@ -59,30 +104,134 @@ class LLMQueryImprover:
         
         # Call LLM
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            improved_text = response.choices[0].message.content.strip()
-            
-            # Parse response
-            return self._parse_llm_response(improved_text, query)
+            improved_text = self._call_llm(self._get_system_prompt(), prompt)
+            return self._store_improvement(query, improved_text)
         
         except Exception as e:
-            print(f"LLM query improvement failed: {e}")
+            logger.warning("LLM query improvement failed: %s", e)
             # Return original query if LLM fails
-            return {
-                "original_query": query,
-                "improved_query": query,
-                "entities": {},
-                "confidence": 0.0
-            }
+            return self._unimproved(query)
+    
+    async def improve_queries_batch(self,
+                                    queries: List[str],
+                                    use_context: bool = True,
+                                    concurrency: int = 16,
+                                    reuse_similar: bool = True) -> List[Dict[str, any]]:
+        """
+        Improve many search queries concurrently using the async LLM client.
+        
+        Args:
+            queries: Original search queries
+            use_context: Whether to use context from previous similar queries
+            concurrency: Maximum number of LLM requests in flight
+            reuse_similar: Whether to return the entities of near-duplicate cached
+                           queries without calling the LLM
+            
+        Returns:
+            List of improvement dictionaries, aligned with queries
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def improve(query: str) -> Dict[str, any]:
+            # The query store is SQLite, so keep its calls off the event loop
+            stored = await asyncio.to_thread(self._get_stored_improvement, query)
+            if stored is not None:
+                return stored
+            
+            context = None
+            if use_context and self.vector_cache:
+                similar_query = await self.vector_cache.afind_similar_query(query, similarity_threshold=0.7)
+                if similar_query and similar_query.get("query_entities"):
+                    if reuse_similar and similar_query["similarity"] >= self.NEAR_DUPLICATE_SIMILARITY:
+                        return self._reuse_similar(query, similar_query)
+                    context = similar_query["query_entities"]
+            
+            prompt = self._build_prompt(query, context)
+            
+            async with semaphore:
+                response = await self.aclient.chat.completions.create(
+                    **self._completion_request(self._get_system_prompt(), prompt)
+                )
+            return await asyncio.to_thread(
+                self._store_improvement, query, response.choices[0].message.content.strip()
+            )
+        
+        results = await asyncio.gather(*[improve(query) for query in queries], return_exceptions=True)
+        
+        improvements = []
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.warning("LLM query improvement failed: %s", result)
+                result = self._unimproved(query)
+            improvements.append(result)
+        return improvements
+    
+    def _reuse_similar(self, query: str, similar_query: Dict) -> Dict:
+        """Build an improvement from a near-duplicate cached query."""
+        return {
+            "original_query": query,
+            "improved_query": similar_query["query"],
+            "entities": similar_query["query_entities"],
+            "confidence": similar_query["similarity"]
+        }
+    
+    def _get_stored_improvement(self, query: str) -> Optional[Dict]:
+        """Get a persisted improvement for a query, if any."""
+        if not self.query_store:
+            return None
+        stored = self.query_store.get_improvement(self._cache_key(query))
+        return {**stored, "original_query": query} if stored is not None else None
+    
+    def _store_improvement(self, query: str, improved_text: str) -> Dict:
+        """Parse an LLM response and persist it if the improvement succeeded."""
+        improvement = self._parse_llm_response(improved_text, query)
+        
+        # Persist successful improvements only
+        if self.query_store and improvement.get("confidence", 0) > 0:
+            self.query_store.set_improvement(self._cache_key(query), improvement)
+        
+        return improvement
+    
+    def _unimproved(self, query: str) -> Dict:
+        """Get the result returned when a query could not be improved."""
+        return {
+            "original_query": query,
+            "improved_query": query,
+            "entities": {},
+            "confidence": 0.0
+        }
+    
+    def _cache_key(self, query: str) -> str:
+        """Get the improvement cache key for a query (model and normalized query)."""
+        return f"{self.model}\x00{query.strip().lower()}"
+    
+    def _complete(self, system_prompt: str, prompt: str) -> str:
+        """
+        Get a chat completion from the LLM.
+        
+        Args:
+            system_prompt: System message
+            prompt: User message
+            
+        Returns:
+            Completion text
+        """
+        response = self.client.chat.completions.create(
+            **self._completion_request(system_prompt, prompt)
+        )
+        return response.choices[0].message.content.strip()
+    
+    def _completion_request(self, system_prompt: str, prompt: str) -> Dict:
+        """Get the chat completion request parameters."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 500
+        }
     
     def _get_system_prompt(self) -> str:
         """Get system prompt for LLM."""
@@ -138,14 +287,11 @@ Query: "{query}"
     
     def _parse_llm_response(self, response_text: str, original_query: str) -> Dict:
         """Parse LLM response."""
-        import json
-        import re
-        
         # Try to extract JSON from response
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        json_match = JSON_OBJECT_PATTERN.search(response_text)
         if json_match:
             try:
-                parsed = json.loads(json_match.group())
+                parsed = json_loads(json_match.group())
                 return {
                     "original_query": original_query,
                     "improved_query": parsed.get("improved_query", original_query),
@@ -156,10 +302,13 @@ Query: "{query}"
                 pass
         
         # Fallback: return original query
-        return {
-            "original_query": original_query,
-            "improved_query": original_query,
-            "entities": {},
-            "confidence": 0.0
-        }
-
+        return self._unimproved(original_query)
+    
+    def close(self):
+        """Close the synchronous HTTP client."""
+        self._http.close()
+    
+    async def aclose(self):
+        """Close the HTTP clients."""
+        self._http.close()
+        await self._ahttp.aclose()
@@ -2,7 +2,7 @@
 Named Entity Recognition module for extracting entities from text
 """
 
-from .extractor import NERExtractor
+from .extractor import NERExtractor, IngestNERExtractor
 
-__all__ = ["NERExtractor"]
+__all__ = ["NERExtractor", "IngestNERExtractor"]
 
@@ -3,11 +3,55 @@ Named Entity Recognition (NER) Extractor
 Extracts entities like people, locations, dates, countries, places, and events
 """
 
+import os
 import spacy
-from typing import Dict, List, Set
+import functools
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 import re
 
+from .gazetteer import COUNTRIES, CITIES, UPPERCASE_COUNTRIES
+
+EVENT_KEYWORDS = ('summit', 'conference', 'meeting', 'convention',
+                  'festival', 'ceremony', 'awards', 'championship',
+                  'tournament', 'exhibition', 'forum', 'symposium')
+
+# Event names: capitalized words (optionally preceded by "the") followed by an event keyword
+EVENT_PATTERN = re.compile(
+    r'(?:(?:the|The)\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:'
+    + '|'.join(keyword.capitalize() for keyword in EVENT_KEYWORDS)
+    + ')'
+)
+
+
+# Date shape sniffers: (pattern, candidate strptime formats, output format).
+# Only the formats of the matching shape are tried.
+DATE_FORMATS = [
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$'), ('%Y-%m-%d',), '%Y-%m-%d'),
+    (re.compile(r'^[A-Za-z]+\s+\d{1,2},\s+\d{4}$'), ('%B %d, %Y', '%b %d, %Y'), '%Y-%m-%d'),
+    (re.compile(r'^\d{1,2}\s+[A-Za-z]+\s+\d{4}$'), ('%d %B %Y', '%d %b %Y'), '%Y-%m-%d'),
+    (re.compile(r'^\d{4}$'), ('%Y',), '%Y'),
+    (re.compile(r'^[A-Za-z]+\s+\d{4}$'), ('%B %Y', '%b %Y'), '%B %Y'),
+]
+
+
+@functools.lru_cache(maxsize=8192)
+def normalize_date(date_text: str) -> str:
+    """
+    Normalize a date string to YYYY-MM-DD, "Month YYYY" or YYYY.
+    Unparseable dates (e.g. "today") are returned unchanged.
+    """
+    for pattern, formats, output_format in DATE_FORMATS:
+        if not pattern.match(date_text):
+            continue
+        for fmt in formats:
+            try:
+                return datetime.strptime(date_text, fmt).strftime(output_format)
+            except ValueError:
+                continue
+    
+    return date_text
+
 
 class NERExtractor:
     """
@@ -26,6 +70,9 @@ class NERExtractor:
         'ORG': 'organizations',  # Organizations (can be used for events context)
     }
     
+    # Pipeline components not needed for entity recognition (only doc.ents is used)
+    UNUSED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter']
+    
     def __init__(self, model_name: str = "en_core_web_sm"):
         """
         Initialize NER extractor with spaCy model.
@@ -40,6 +87,30 @@ class NERExtractor:
                 f"spaCy model '{model_name}' not found. "
                 f"Install it with: python -m spacy download {model_name}"
             )
+        
+        # Keep only the NER component and the embedding layer it may listen to
+        for name in self.UNUSED_COMPONENTS:
+            if name in self.nlp.pipe_names:
+                self.nlp.disable_pipe(name)
+        
+        # spaCy entity labels stored as is -> result category
+        self._plain_categories = {
+            label: category
+            for label, category in self.ENTITY_MAPPINGS.items()
+            if category in ('people', 'locations', 'places')
+        }
+        
+        # spaCy entity labels needing special handling -> handler adding the entity
+        handlers = {
+            'countries': self._add_gpe,
+            'dates': self._add_date,
+            'organizations': self._add_organization,
+        }
+        self._handlers = {
+            label: handlers[category]
+            for label, category in self.ENTITY_MAPPINGS.items()
+            if category in handlers
+        }
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
@@ -51,154 +122,230 @@ class NERExtractor:
         Returns:
             Dictionary with entity categories as keys and lists of entities as values
         """
-        doc = self.nlp(text)
+        return self._categorize_entities(self.nlp(text), text)
+    
+    def extract_entities_batch(self,
+                               texts: List[str],
+                               batch_size: int = 64,
+                               n_process: Optional[int] = None) -> List[Dict[str, List[str]]]:
+        """
+        Extract named entities from many texts with batched spaCy processing.
+        
+        Args:
+            texts: Input texts to extract entities from
+            batch_size: Number of texts per spaCy batch
+            n_process: Number of worker processes (defaults to CPU count - 1 when
+                       there is more than one batch, otherwise 1)
+            
+        Returns:
+            List of entity dictionaries, aligned with texts
+        """
+        if n_process is None:
+            n_process = max(1, (os.cpu_count() or 1) - 1) if len(texts) > batch_size else 1
+        
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        return [self._categorize_entities(doc, text) for doc, text in zip(docs, texts)]
+    
+    def _categorize_entities(self, doc, text: str) -> Dict[str, List[str]]:
+        """
+        Categorize the entities of a processed spaCy document.
         
-        # Initialize result structure
+        Args:
+            doc: spaCy document
+            text: Source text of the document
+            
+        Returns:
+            Dictionary with entity categories as keys and lists of entities as values
+        """
+        # Initialize result structure (dict keys act as ordered sets)
         entities = {
-            'people': [],
-            'locations': [],
-            'dates': [],
-            'countries': [],
-            'places': [],
-            'events': []
+            'people': {},
+            'locations': {},
+            'dates': {},
+            'countries': {},
+            'places': {},
+            'events': {}
         }
         
         # Extract and categorize entities
-        seen_entities = {category: set() for category in entities.keys()}
-        
+        plain_categories = self._plain_categories
+        handlers = self._handlers
         for ent in doc.ents:
-            entity_text = ent.text.strip()
-            entity_label = ent.label_
-            
-            # Map spaCy entity type to our category
-            category = self.ENTITY_MAPPINGS.get(entity_label)
-            
+            category = plain_categories.get(ent.label_)
             if category:
-                # Handle special cases
-                if category == 'countries':
-                    # GPE can be countries, cities, or states
-                    # Try to identify if it's a country
-                    if self._is_likely_country(entity_text):
-                        if entity_text not in seen_entities['countries']:
-                            entities['countries'].append(entity_text)
-                            seen_entities['countries'].add(entity_text)
-                    else:
-                        # Treat as location
-                        if entity_text not in seen_entities['locations']:
-                            entities['locations'].append(entity_text)
-                            seen_entities['locations'].add(entity_text)
-                elif category == 'places':
-                    if entity_text not in seen_entities['places']:
-                        entities['places'].append(entity_text)
-                        seen_entities['places'].add(entity_text)
-                elif category == 'locations':
-                    if entity_text not in seen_entities['locations']:
-                        entities['locations'].append(entity_text)
-                        seen_entities['locations'].add(entity_text)
-                elif category == 'people':
-                    if entity_text not in seen_entities['people']:
-                        entities['people'].append(entity_text)
-                        seen_entities['people'].add(entity_text)
-                elif category == 'dates':
-                    # Normalize date format
-                    normalized_date = self._normalize_date(entity_text)
-                    if normalized_date and normalized_date not in seen_entities['dates']:
-                        entities['dates'].append(normalized_date)
-                        seen_entities['dates'].add(normalized_date)
-                elif category == 'organizations':
-                    # Organizations might indicate events
-                    # Check if it sounds like an event
-                    if self._is_likely_event(entity_text):
-                        if entity_text not in seen_entities['events']:
-                            entities['events'].append(entity_text)
-                            seen_entities['events'].add(entity_text)
+                entities[category][ent.text.strip()] = None
+                continue
+            
+            handler = handlers.get(ent.label_)
+            if handler:
+                handler(ent.text.strip(), entities)
         
         # Extract additional events using pattern matching
-        events = self._extract_events(text)
-        for event in events:
-            if event not in seen_entities['events']:
-                entities['events'].append(event)
-                seen_entities['events'].add(event)
+        entities['events'].update(dict.fromkeys(self._extract_events(text)))
         
-        return entities
+        return {category: list(values) for category, values in entities.items()}
+    
+    def _add_gpe(self, entity_text: str, entities: Dict[str, Dict]):
+        """Add a GPE entity as a country, or as a location if it is not a country."""
+        # GPE can be countries, cities, or states
+        if self._is_likely_country(entity_text):
+            entities['countries'][entity_text] = None
+        else:
+            entities['locations'][entity_text] = None
+    
+    def _add_date(self, entity_text: str, entities: Dict[str, Dict]):
+        """Add a date entity in normalized format."""
+        normalized_date = self._normalize_date(entity_text)
+        if normalized_date:
+            entities['dates'][normalized_date] = None
+    
+    def _add_organization(self, entity_text: str, entities: Dict[str, Dict]):
+        """Add an organization as an event if it sounds like one."""
+        if self._is_likely_event(entity_text):
+            entities['events'][entity_text] = None
     
     def _is_likely_country(self, text: str) -> bool:
         """
-        Heuristic to determine if a GPE entity is likely a country.
+        Determine if a GPE entity is a country (other GPEs are treated as locations).
         """
-        # Common country indicators
-        country_indicators = ['United States', 'United Kingdom', 'USA', 'UK', 
-                            'America', 'Britain', 'France', 'Germany', 'China', 
-                            'Japan', 'India', 'Russia', 'Canada', 'Australia']
-        
-        text_lower = text.lower()
-        for indicator in country_indicators:
-            if indicator.lower() in text_lower or text_lower in indicator.lower():
-                return True
-        
-        # If it's a single word and capitalized, might be a country
-        if len(text.split()) == 1 and text[0].isupper():
-            return True
-        
-        return False
+        return text.lower() in COUNTRIES or text in UPPERCASE_COUNTRIES
     
     def _is_likely_event(self, text: str) -> bool:
         """
         Heuristic to determine if an organization or text might be an event.
         """
-        event_keywords = ['summit', 'conference', 'meeting', 'convention', 
-                         'festival', 'ceremony', 'awards', 'championship',
-                         'tournament', 'exhibition', 'forum', 'symposium']
-        
         text_lower = text.lower()
-        return any(keyword in text_lower for keyword in event_keywords)
+        return any(keyword in text_lower for keyword in EVENT_KEYWORDS)
     
     def _extract_events(self, text: str) -> List[str]:
         """
         Extract event names using pattern matching.
         """
-        events = []
-        
-        # Pattern for events: "Event Name" or Event Name followed by keywords
-        event_patterns = [
-            r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:Summit|Conference|Meeting|Convention|Festival|Ceremony|Awards|Championship|Tournament|Exhibition|Forum|Symposium)',
-            r'(?:the|The)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:Summit|Conference|Meeting|Convention|Festival|Ceremony|Awards|Championship|Tournament|Exhibition|Forum|Symposium)',
-        ]
-        
-        for pattern in event_patterns:
-            matches = re.findall(pattern, text)
-            events.extend(matches)
-        
-        return list(set(events))  # Remove duplicates
+        return list(dict.fromkeys(EVENT_PATTERN.findall(text)))  # Remove duplicates
     
     def _normalize_date(self, date_text: str) -> str:
         """
         Normalize date strings to a standard format.
         """
-        # Try to parse common date formats
-        date_formats = [
-            '%Y-%m-%d',
-            '%B %d, %Y',
-            '%b %d, %Y',
-            '%d %B %Y',
-            '%d %b %Y',
-            '%Y',
-            '%B %Y',
-            '%b %Y',
-        ]
-        
-        for fmt in date_formats:
-            try:
-                dt = datetime.strptime(date_text, fmt)
-                if '%Y' in fmt and len(fmt.replace('%Y', '').replace('%', '').replace(' ', '').replace(',', '').replace('-', '')) == 0:
-                    return str(dt.year)
-                elif '%Y' in fmt and '%d' not in fmt:
-                    return dt.strftime('%B %Y')
-                else:
-                    return dt.strftime('%Y-%m-%d')
-            except ValueError:
+        return normalize_date(date_text)
+
+
+class IngestNERExtractor(NERExtractor):
+    """
+    Fast regex and gazetteer based entity extractor for bulk ingest.
+    Produces the same categories as NERExtractor without running a spaCy model,
+    leaving spaCy to query-time extraction.
+    """
+    
+    MONTHS = (r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|'
+              r'Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)')
+    
+    # Runs of capitalized words on one line (e.g. "John Matthews", "United States")
+    CAPITALIZED_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:[ \t]+[A-Z][a-z]+)*\b')
+    
+    # Dates in the formats understood by _normalize_date
+    DATE_PATTERN = re.compile(
+        rf'\b(?:\d{{4}}-\d{{2}}-\d{{2}}'
+        rf'|{MONTHS}\s+\d{{1,2}},\s*\d{{4}}'
+        rf'|\d{{1,2}}\s+{MONTHS}\s+\d{{4}}'
+        rf'|{MONTHS}\s+\d{{4}}'
+        rf'|(?:19|20)\d{{2}})\b'
+    )
+    
+    # Leading words stripped from capitalized runs (sentence starters and titles)
+    LEADING_WORDS = frozenset({
+        'A', 'An', 'And', 'As', 'At', 'After', 'Before', 'But', 'By', 'During', 'For',
+        'From', 'In', 'Of', 'On', 'The', 'This', 'That', 'These', 'Those', 'To',
+        'When', 'While', 'With', 'Chancellor', 'Dr', 'General', 'Governor', 'Judge',
+        'King', 'Lady', 'Lord', 'Mayor', 'Minister', 'Mr', 'Mrs', 'Ms',
+        'President', 'Prime', 'Prince', 'Princess', 'Prof', 'Professor', 'Queen',
+        'Secretary', 'Senator', 'Sir',
+    })
+    
+    # Final words marking facilities (spaCy FAC)
+    PLACE_SUFFIXES = frozenset({
+        'Airport', 'Arena', 'Avenue', 'Bridge', 'Building', 'Castle', 'Cathedral',
+        'Centre', 'Center', 'Church', 'Hall', 'Highway', 'Hospital', 'Museum',
+        'Palace', 'Park', 'Road', 'Square', 'Stadium', 'Station', 'Street', 'Tower',
+    })
+    
+    # Capitalized event keywords ending event names (e.g. "Climate Summit")
+    EVENT_WORDS = frozenset(keyword.capitalize() for keyword in EVENT_KEYWORDS)
+    
+    def __init__(self):
+        """
+        Initialize ingest NER extractor. No spaCy model is loaded.
+        """
+        self.nlp = None
+    
+    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+        """
+        Extract named entities from text and categorize them.
+        
+        Args:
+            text: Input text to extract entities from
+            
+        Returns:
+            Dictionary with entity categories as keys and lists of entities as values
+        """
+        # Ordered sets (dict keys) per category
+        buckets = {
+            'people': {},
+            'locations': {},
+            'dates': {},
+            'countries': {},
+            'places': {},
+            'events': {}
+        }
+        
+        # Single scan for capitalized runs; events are read off the same runs
+        # instead of rescanning the text with EVENT_PATTERN
+        for match in self.CAPITALIZED_PATTERN.finditer(text):
+            words = match.group().split()
+            while words and words[0] in self.LEADING_WORDS:
+                words = words[1:]
+            if not words:
+                continue
+            
+            # Event name: the words before the last event keyword
+            for i in range(len(words) - 1, 0, -1):
+                if words[i] in self.EVENT_WORDS:
+                    buckets['events'][' '.join(words[:i])] = None
+                    break
+            
+            entity_text = ' '.join(words)
+            entity_lower = entity_text.lower()
+            if entity_lower in COUNTRIES:
+                buckets['countries'][entity_text] = None
+            elif entity_lower in CITIES:
+                buckets['locations'][entity_text] = None
+            elif words[-1] in self.PLACE_SUFFIXES:
+                buckets['places'][entity_text] = None
+            elif self._is_likely_event(entity_text):
                 continue
+            elif 2 <= len(words) <= 3:
+                buckets['people'][entity_text] = None
         
-        # If parsing fails, return original (might be relative like "today", "yesterday")
-        return date_text
-
+        for match in self.DATE_PATTERN.finditer(text):
+            normalized_date = self._normalize_date(match.group())
+            if normalized_date:
+                buckets['dates'][normalized_date] = None
+        
+        return {category: list(values) for category, values in buckets.items()}
+    
+    def extract_entities_batch(self,
+                               texts: List[str],
+                               batch_size: int = 64,
+                               n_process: Optional[int] = None) -> List[Dict[str, List[str]]]:
+        """
+        Extract named entities from many texts.
+        
+        Args:
+            texts: Input texts to extract entities from
+            batch_size: Unused (kept for interface compatibility with NERExtractor)
+            n_process: Unused (kept for interface compatibility with NERExtractor)
+            
+        Returns:
+            List of entity dictionaries, aligned with texts
+        """
+        return [self.extract_entities(text) for text in texts]
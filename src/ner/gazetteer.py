@@ -0,0 +1,69 @@
+"""
+Gazetteer of country and city names used to classify geopolitical entities
+"""
+
+# Sovereign states plus common short forms and aliases (lowercase)
+COUNTRIES = frozenset({
+    "afghanistan", "albania", "algeria", "andorra", "angola", "antigua and barbuda",
+    "argentina", "armenia", "australia", "austria", "azerbaijan", "bahamas", "bahrain",
+    "bangladesh", "barbados", "belarus", "belgium", "belize", "benin", "bhutan",
+    "bolivia", "bosnia and herzegovina", "botswana", "brazil", "brunei", "bulgaria",
+    "burkina faso", "burundi", "cambodia", "cameroon", "canada", "cape verde",
+    "central african republic", "chad", "chile", "china", "colombia", "comoros",
+    "congo", "costa rica", "croatia", "cuba", "cyprus", "czech republic", "czechia",
+    "democratic republic of the congo", "denmark", "djibouti", "dominica",
+    "dominican republic", "east timor", "ecuador", "egypt", "el salvador",
+    "equatorial guinea", "eritrea", "estonia", "eswatini", "ethiopia", "fiji",
+    "finland", "france", "gabon", "gambia", "georgia", "germany", "ghana", "greece",
+    "grenada", "guatemala", "guinea", "guinea-bissau", "guyana", "haiti", "honduras",
+    "hungary", "iceland", "india", "indonesia", "iran", "iraq", "ireland", "israel",
+    "italy", "ivory coast", "jamaica", "japan", "jordan", "kazakhstan", "kenya",
+    "kiribati", "kosovo", "kuwait", "kyrgyzstan", "laos", "latvia", "lebanon",
+    "lesotho", "liberia", "libya", "liechtenstein", "lithuania", "luxembourg",
+    "madagascar", "malawi", "malaysia", "maldives", "mali", "malta",
+    "marshall islands", "mauritania", "mauritius", "mexico", "micronesia", "moldova",
+    "monaco", "mongolia", "montenegro", "morocco", "mozambique", "myanmar", "namibia",
+    "nauru", "nepal", "netherlands", "new zealand", "nicaragua", "niger", "nigeria",
+    "north korea", "north macedonia", "norway", "oman", "pakistan", "palau",
+    "palestine", "panama", "papua new guinea", "paraguay", "peru", "philippines",
+    "poland", "portugal", "qatar", "romania", "russia", "rwanda",
+    "saint kitts and nevis", "saint lucia", "saint vincent and the grenadines",
+    "samoa", "san marino", "sao tome and principe", "saudi arabia", "senegal",
+    "serbia", "seychelles", "sierra leone", "singapore", "slovakia", "slovenia",
+    "solomon islands", "somalia", "south africa", "south korea", "south sudan",
+    "spain", "sri lanka", "sudan", "suriname", "sweden", "switzerland", "syria",
+    "taiwan", "tajikistan", "tanzania", "thailand", "togo", "tonga",
+    "trinidad and tobago", "tunisia", "turkey", "turkmenistan", "tuvalu", "uganda",
+    "ukraine", "united arab emirates", "united kingdom", "united states", "uruguay",
+    "uzbekistan", "vanuatu", "vatican city", "venezuela", "vietnam", "yemen",
+    "zambia", "zimbabwe",
+    # Aliases
+    "america", "britain", "great britain", "england", "scotland", "wales",
+    "northern ireland", "holland", "korea", "the netherlands", "the philippines",
+    "the united kingdom", "the united states", "u.k.", "u.s.", "u.s.a.", "uae", "uk",
+    "united states of america", "usa", "ussr", "soviet union",
+})
+
+# Major cities, states and regions that spaCy tags as GPE but are not countries (lowercase)
+CITIES = frozenset({
+    "abu dhabi", "addis ababa", "amsterdam", "ankara", "athens", "atlanta",
+    "auckland", "baghdad", "bangkok", "barcelona", "beijing", "beirut", "berlin",
+    "bogota", "boston", "brasilia", "brussels", "bucharest", "budapest",
+    "buenos aires", "cairo", "california", "cape town", "caracas", "chicago",
+    "copenhagen", "dallas", "delhi", "dhaka", "doha", "dubai", "dublin", "edinburgh",
+    "florida", "frankfurt", "geneva", "hanoi", "havana", "helsinki", "hong kong",
+    "houston", "istanbul", "jakarta", "jerusalem", "johannesburg", "kabul", "karachi",
+    "kyiv", "kiev", "lagos", "lima", "lisbon", "london", "los angeles",
+    "madrid", "manchester", "manila", "melbourne", "mexico city", "miami", "milan",
+    "montreal", "moscow", "mumbai", "munich", "nairobi", "new delhi", "new york",
+    "new york city", "nyc", "oslo", "ottawa", "paris", "philadelphia", "prague",
+    "rio de janeiro", "riyadh", "rome", "san francisco", "santiago", "sao paulo",
+    "seattle", "seoul", "shanghai", "singapore city", "stockholm", "sydney",
+    "taipei", "tehran", "tel aviv", "texas", "tokyo", "toronto", "vancouver",
+    "vienna", "warsaw", "washington", "washington d.c.", "washington dc", "zurich",
+})
+
+# Country abbreviations that are also common words ("Us"), so they only match
+# in their exact uppercase form ("LA" is left out of CITIES for the same reason;
+# spaCy GPEs that are not countries are treated as locations anyway)
+UPPERCASE_COUNTRIES = frozenset({"US"})
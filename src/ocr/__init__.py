@@ -2,7 +2,7 @@
 OCR module for extracting text from documents
 """
 
-from .extractor import OCRExtractor
+from .extractor import OCRExtractor, find_files
 
-__all__ = ["OCRExtractor"]
+__all__ = ["OCRExtractor", "find_files"]
 
@@ -3,13 +3,43 @@ OCR Text Extractor for PDFs and Images
 """
 
 import os
+import logging
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
 from pathlib import Path
 import pytesseract
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pypdf
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def find_files(directory_path: str, extensions: List[str]) -> List[str]:
+    """
+    Recursively collect files with the given extensions in a single directory walk.
+    
+    Args:
+        directory_path: Path to directory
+        extensions: File extensions to match (case-insensitive)
+        
+    Returns:
+        Sorted list of file paths
+    """
+    extension_set = {extension.lower() for extension in extensions}
+    files = []
+    pending = [directory_path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in extension_set:
+                    files.append(entry.path)
+    return sorted(files)
+
 
 class OCRExtractor:
     """
@@ -17,13 +47,21 @@ class OCRExtractor:
     Supports both PDF text extraction and OCR for scanned documents.
     """
     
-    def __init__(self, tesseract_cmd: Optional[str] = None):
+    # Direct PDF text below this many characters per page triggers OCR
+    MIN_CHARS_PER_PAGE = 200
+    
+    # Resolution PDF pages are rasterized at for OCR (sufficient for >10pt text)
+    OCR_DPI = 150
+    
+    def __init__(self, tesseract_cmd: Optional[str] = None, max_workers: Optional[int] = None):
         """
         Initialize OCR extractor.
         
         Args:
             tesseract_cmd: Path to tesseract executable (if not in PATH)
+            max_workers: Number of PDF pages rasterized and OCRed in parallel (defaults to CPU count)
         """
+        self.max_workers = max_workers or os.cpu_count()
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         elif os.getenv("TESSERACT_CMD"):
@@ -46,53 +84,120 @@ class OCRExtractor:
         except Exception as e:
             raise ValueError(f"Error extracting text from image {image_path}: {str(e)}")
     
-    def extract_from_pdf(self, pdf_path: str, use_ocr: bool = True) -> str:
+    def extract_from_pdf(self,
+                         pdf_path: str,
+                         ocr_fallback: bool = True,
+                         use_ocr: Optional[bool] = None,
+                         max_workers: Optional[int] = None) -> str:
         """
         Extract text from a PDF file.
-        First tries direct text extraction, falls back to OCR if needed.
+        Uses the embedded text layer when it has enough text; OCR is only run as a
+        fallback when direct extraction yields too little text (e.g. scanned PDFs),
+        in which case the OCR text replaces the direct text.
         
         Args:
             pdf_path: Path to PDF file
-            use_ocr: Whether to use OCR if direct extraction fails
+            ocr_fallback: Whether to use OCR if direct extraction yields too little text
+            use_ocr: Deprecated. If True, always run OCR and append its text to the
+                     direct text; if False, only OCR when direct extraction yields
+                     no text at all
+            max_workers: Number of pages OCRed in parallel (defaults to the extractor's max_workers)
             
         Returns:
             Extracted text as string
         """
+        if use_ocr is not None:
+            warnings.warn(
+                "use_ocr is deprecated; use ocr_fallback instead",
+                DeprecationWarning,
+                stacklevel=2
+            )
+        
         text_parts = []
+        n_pages = 0
         
         # Try direct text extraction first
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = pypdf.PdfReader(file)
-                for page_num, page in enumerate(pdf_reader.pages):
+                n_pages = len(pdf_reader.pages)
+                for page in pdf_reader.pages:
                     page_text = page.extract_text()
                     if page_text.strip():
                         text_parts.append(page_text)
         except Exception as e:
-            print(f"Direct PDF extraction failed: {e}")
+            logger.warning("Direct PDF extraction failed for %s: %s", pdf_path, e)
         
-        # If no text extracted or use_ocr is True, try OCR
-        if not text_parts or use_ocr:
-            try:
-                images = convert_from_path(pdf_path)
-                for image in images:
-                    ocr_text = pytesseract.image_to_string(image)
-                    if ocr_text.strip():
-                        text_parts.append(ocr_text)
-            except Exception as e:
-                print(f"OCR extraction failed: {e}")
+        if use_ocr is not None:
+            # Legacy behaviour: OCR text is appended to the direct text
+            if use_ocr or not text_parts:
+                try:
+                    text_parts.extend(self._ocr_pdf_pages(pdf_path, n_pages, max_workers))
+                except Exception as e:
+                    logger.warning("OCR extraction failed for %s: %s", pdf_path, e)
+        else:
+            # Fall back to OCR if direct extraction yielded too little text
+            direct_chars = sum(len(part) for part in text_parts)
+            if ocr_fallback and direct_chars < self.MIN_CHARS_PER_PAGE * max(n_pages, 1):
+                try:
+                    ocr_parts = self._ocr_pdf_pages(pdf_path, n_pages, max_workers)
+                    if ocr_parts:
+                        text_parts = ocr_parts
+                except Exception as e:
+                    logger.warning("OCR extraction failed for %s: %s", pdf_path, e)
         
         if not text_parts:
             raise ValueError(f"No text could be extracted from PDF: {pdf_path}")
         
         return "\n\n".join(text_parts).strip()
     
-    def extract_from_file(self, file_path: str) -> str:
+    def _ocr_pdf_pages(self, pdf_path: str, n_pages: int = 0, max_workers: Optional[int] = None) -> List[str]:
+        """
+        OCR the pages of a PDF in chunks of max_workers pages, so only one chunk
+        of rasterized pages is held in memory at a time.
+        
+        Args:
+            pdf_path: Path to PDF file
+            n_pages: Number of pages (looked up with pdfinfo if 0)
+            max_workers: Number of pages OCRed in parallel (defaults to the extractor's max_workers)
+            
+        Returns:
+            Non-empty OCR text of each page, in page order
+        """
+        if not n_pages:
+            n_pages = pdfinfo_from_path(pdf_path)["Pages"]
+        
+        max_workers = max_workers or self.max_workers
+        ocr_parts = []
+        chunk_size = max_workers
+        # Each page is OCRed by a separate tesseract process
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for first_page in range(1, n_pages + 1, chunk_size):
+                images = convert_from_path(
+                    pdf_path,
+                    dpi=self.OCR_DPI,
+                    first_page=first_page,
+                    last_page=min(first_page + chunk_size - 1, n_pages),
+                    thread_count=max_workers,
+                    fmt='jpeg',
+                    grayscale=True
+                )
+                ocr_parts.extend(
+                    ocr_text for ocr_text in executor.map(pytesseract.image_to_string, images)
+                    if ocr_text.strip()
+                )
+                del images
+        
+        return ocr_parts
+    
+    def extract_from_file(self, file_path: str, max_workers: Optional[int] = None) -> str:
         """
         Extract text from a file (auto-detects PDF or image).
         
         Args:
             file_path: Path to file
+            max_workers: Number of PDF pages OCRed in parallel (defaults to the extractor's
+                         max_workers; pass 1 when files are already processed in parallel)
             
         Returns:
             Extracted text as string
@@ -101,7 +206,7 @@ class OCRExtractor:
         suffix = path.suffix.lower()
         
         if suffix == '.pdf':
-            return self.extract_from_pdf(file_path)
+            return self.extract_from_pdf(file_path, max_workers=max_workers)
         elif suffix in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']:
             return self.extract_from_image(file_path)
         else:
@@ -123,15 +228,12 @@ class OCRExtractor:
             extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
         
         results = {}
-        directory = Path(directory_path)
         
-        for ext in extensions:
-            for file_path in directory.rglob(f"*{ext}"):
-                try:
-                    text = self.extract_from_file(str(file_path))
-                    results[str(file_path)] = text
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+        for file_path in find_files(directory_path, extensions):
+            try:
+                results[file_path] = self.extract_from_file(file_path)
+            except Exception as e:
+                logger.warning("Error processing %s: %s", file_path, e)
         
         return results
 
@@ -3,6 +3,7 @@ Main pipeline for news aggregation and search
 """
 
 from .aggregator import NewsAggregator
+from .jobs import JobQueue
 
-__all__ = ["NewsAggregator"]
+__all__ = ["NewsAggregator", "JobQueue"]
 
@@ -2,14 +2,26 @@
 Main news aggregation pipeline
 """
 
-from typing import List, Dict, Optional
+import os
+import queue
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Union
 from pathlib import Path
-from ..ocr.extractor import OCRExtractor
-from ..ner.extractor import NERExtractor
+from ..ocr.extractor import OCRExtractor, find_files
+from ..ner.extractor import NERExtractor, IngestNERExtractor
 from ..rectifier.tfidf_rectifier import TFIDFRectifier
 from ..database.nosql_db import NoSQLDatabase
 from tqdm import tqdm
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# End-of-stream marker for pipeline queues
+_DONE = object()
+
 
 class NewsAggregator:
     """
@@ -17,12 +29,28 @@ class NewsAggregator:
     Orchestrates OCR, NER, TF-IDF rectification, and indexing.
     """
     
+    # Capacity of the queues between pipeline stages
+    PIPELINE_QUEUE_SIZE = 8
+    
+    # Maximum number of texts sent to NER at once in directory aggregation
+    NER_BATCH_SIZE = 32
+    
+    # Seconds NER waits for more texts to fill a batch before running a partial one
+    NER_BATCH_TIMEOUT_SECONDS = 0.5
+    
+    # Texts shorter than this (after stripping) are rejected before NER
+    MIN_TEXT_LENGTH = 50
+    
+    # Texts are truncated to this many characters before spaCy NER
+    MAX_NER_TEXT_LENGTH = 100_000
+    
     def __init__(self,
                  database: NoSQLDatabase,
                  ocr_extractor: Optional[OCRExtractor] = None,
-                 ner_extractor: Optional[NERExtractor] = None,
+                 ner_extractor: Optional[Union[NERExtractor, IngestNERExtractor]] = None,
                  rectifier: Optional[TFIDFRectifier] = None,
-                 min_relevance: float = 0.3):
+                 min_relevance: float = 0.3,
+                 lazy_spacy: bool = True):
         """
         Initialize news aggregator.
         
@@ -32,10 +60,12 @@ class NewsAggregator:
             ner_extractor: NER extractor instance (creates new if None)
             rectifier: TF-IDF rectifier instance (creates new if None)
             min_relevance: Minimum relevance threshold for entities
+            lazy_spacy: Use the regex-based IngestNERExtractor instead of spaCy when
+                        no ner_extractor is given (spaCy is then only used at query time)
         """
         self.database = database
         self.ocr_extractor = ocr_extractor or OCRExtractor()
-        self.ner_extractor = ner_extractor or NERExtractor()
+        self.ner_extractor = ner_extractor or (IngestNERExtractor() if lazy_spacy else NERExtractor())
         self.rectifier = rectifier or TFIDFRectifier(min_relevance=min_relevance)
         self.min_relevance = min_relevance
     
@@ -57,46 +87,82 @@ class NewsAggregator:
         if url is None:
             url = file_path
         
-        # Step 1: Extract text using OCR
-        print(f"Extracting text from {file_path}...")
-        text = self.ocr_extractor.extract_from_file(file_path)
+        rectified = self._process_file(file_path, url, filter_low_relevance)
         
-        if not text or len(text.strip()) < 50:
-            raise ValueError(f"Insufficient text extracted from {file_path}")
+        # Step 4: Index in database
+        logger.debug("Indexing document %s", url)
+        doc_id = self.database.index_document(rectified)
+        rectified["_id"] = doc_id
+        
+        return rectified
+    
+    def _process_file(self,
+                      file_path: str,
+                      url: str,
+                      filter_low_relevance: bool = True) -> Dict:
+        """
+        Run OCR, NER and TF-IDF rectification on a file without indexing it.
+        
+        Args:
+            file_path: Path to file (PDF or image)
+            url: URL or identifier for the news item
+            filter_low_relevance: Whether to filter low-relevance entities
+            
+        Returns:
+            Rectified document dictionary
+        """
+        # Step 1: Extract text using OCR
+        text = self._extract_text(file_path)
         
         # Step 2: Extract entities using NER
-        print(f"Extracting entities...")
+        logger.debug("Extracting entities from %s", file_path)
         entities = self.ner_extractor.extract_entities(text)
         
         # Step 3: Rectify entities with TF-IDF weights
-        print(f"Rectifying entities...")
-        rectified = self.rectifier.rectify(
+        logger.debug("Rectifying entities for %s", file_path)
+        return self.rectifier.rectify(
             entities=entities,
             source_text=text,
             url=url,
             filter_low_relevance=filter_low_relevance
         )
+    
+    def _extract_text(self, file_path: str, max_workers: Optional[int] = None) -> str:
+        """
+        Extract text from a file using OCR.
         
-        # Step 4: Index in database
-        print(f"Indexing document...")
-        doc_id = self.database.index_document(rectified)
-        rectified["_id"] = doc_id
+        Args:
+            file_path: Path to file (PDF or image)
+            max_workers: Number of PDF pages OCRed in parallel (defaults to the OCR extractor's)
+            
+        Returns:
+            Extracted text
+        """
+        logger.debug("Extracting text from %s", file_path)
+        text = self.ocr_extractor.extract_from_file(file_path, max_workers=max_workers)
         
-        return rectified
+        if not text or len(text.strip()) < self.MIN_TEXT_LENGTH:
+            raise ValueError(f"Insufficient text extracted from {file_path}")
+        
+        return text
     
     def aggregate_from_directory(self,
                                  directory_path: str,
                                  url_prefix: Optional[str] = None,
                                  filter_low_relevance: bool = True,
-                                 extensions: Optional[List[str]] = None) -> List[Dict]:
+                                 extensions: Optional[List[str]] = None,
+                                 max_workers: Optional[int] = None) -> List[Dict]:
         """
         Aggregate news from all supported files in a directory.
+        OCR (in parallel), batched NER and rectification run as overlapping
+        pipeline stages, and documents are indexed in a single batch.
         
         Args:
             directory_path: Path to directory
             url_prefix: Prefix for URLs (defaults to directory path)
             filter_low_relevance: Whether to filter low-relevance entities
             extensions: File extensions to process (defaults to .pdf, .jpg, .png)
+            max_workers: Number of worker threads (defaults to CPU count)
             
         Returns:
             List of rectified documents
@@ -108,34 +174,140 @@ class NewsAggregator:
         if url_prefix is None:
             url_prefix = str(directory)
         
-        # Find all files
-        files = []
-        for ext in extensions:
-            files.extend(directory.rglob(f"*{ext}"))
+        # Phase 1: find all files
+        files = find_files(str(directory), extensions)
         
         if not files:
-            print(f"No files found in {directory_path}")
+            logger.info("No files found in %s", directory_path)
             return []
         
-        print(f"Found {len(files)} files to process")
+        logger.info("Found %d files to process", len(files))
         
-        # Process each file
-        results = []
-        for file_path in tqdm(files, desc="Processing files"):
+        # Start the largest files first so one big file does not straggle at the end
+        def file_size(file_path: str) -> int:
+            try:
+                return os.stat(file_path).st_size
+            except OSError:
+                return 0
+        
+        files.sort(key=file_size, reverse=True)
+        
+        def extract(file_path: str) -> Optional[str]:
+            # Files are OCRed in parallel, so each file's pages are OCRed one at a
+            # time (a page pool per file would run up to cpu_count² OCR jobs)
             try:
-                url = f"{url_prefix}/{file_path.relative_to(directory)}"
-                rectified = self.aggregate_from_file(
-                    str(file_path),
-                    url=url,
-                    filter_low_relevance=filter_low_relevance
-                )
-                results.append(rectified)
+                return self._extract_text(file_path, max_workers=1)
             except Exception as e:
-                print(f"Error processing {file_path}: {e}")
-                continue
+                logger.warning("Error processing %s: %s", file_path, e)
+                return None
+        
+        # Phase 2: pipeline OCR -> NER -> rectify so the stages overlap.
+        # Bounded queues apply backpressure; failed files flow through with None.
+        text_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        entity_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        
+        def ocr_stage():
+            # Extract text from files in parallel (OCR releases the GIL)
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                    for file_path, text in zip(files, executor.map(extract, files)):
+                        text_queue.put((file_path, text))
+            finally:
+                text_queue.put(_DONE)
+        
+        def ner_stage():
+            # Extract entities in batches of up to NER_BATCH_SIZE texts, waiting up to
+            # NER_BATCH_TIMEOUT_SECONDS for more text once a batch is started
+            try:
+                done = False
+                while not done:
+                    batch = [text_queue.get()]
+                    deadline = time.monotonic() + self.NER_BATCH_TIMEOUT_SECONDS
+                    while batch[-1] is not _DONE and len(batch) < self.NER_BATCH_SIZE:
+                        try:
+                            batch.append(text_queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                        except queue.Empty:
+                            break
+                    if batch[-1] is _DONE:
+                        batch.pop()
+                        done = True
+                    
+                    extracted = [(file_path, text) for file_path, text in batch if text is not None]
+                    all_entities = self._extract_entities_batch([text for _, text in extracted])
+                    
+                    entities_by_file = {
+                        file_path: entities
+                        for (file_path, _), entities in zip(extracted, all_entities)
+                    }
+                    for file_path, text in batch:
+                        entity_queue.put((file_path, text, entities_by_file.get(file_path)))
+            finally:
+                entity_queue.put(_DONE)
+        
+        stages = [threading.Thread(target=stage, daemon=True) for stage in (ocr_stage, ner_stage)]
+        for stage in stages:
+            stage.start()
+        
+        # Rectify entities with TF-IDF weights as they arrive
+        results = []
+        with tqdm(total=len(files), desc="Processing files") as progress:
+            while (item := entity_queue.get()) is not _DONE:
+                file_path, text, entities = item
+                progress.update(1)
+                if entities is None:
+                    continue
+                try:
+                    results.append(self.rectifier.rectify(
+                        entities=entities,
+                        source_text=text,
+                        url=f"{url_prefix}/{Path(file_path).relative_to(directory)}",
+                        filter_low_relevance=filter_low_relevance
+                    ))
+                except Exception as e:
+                    logger.warning("Error processing %s: %s", file_path, e)
+        
+        for stage in stages:
+            stage.join()
+        
+        # Phase 3: index all documents in one batch
+        if results:
+            doc_ids = self.database.index_documents(results)
+            for rectified, doc_id in zip(results, doc_ids):
+                rectified["_id"] = doc_id
         
         return results
     
+    def _extract_entities_batch(self, texts: List[str]) -> List[Optional[Dict[str, List[str]]]]:
+        """
+        Extract entities from several texts, in one batch if the NER extractor supports it.
+        
+        Args:
+            texts: List of texts
+            
+        Returns:
+            Entities of each text (None where extraction failed)
+        """
+        if not texts:
+            return []
+        
+        if hasattr(self.ner_extractor, "extract_entities_batch"):
+            try:
+                return self.ner_extractor.extract_entities_batch(texts)
+            except Exception as e:
+                logger.warning("Error extracting entities: %s", e)
+                return [None] * len(texts)
+        
+        # Extractors without batch support: one text at a time, so a failure
+        # only loses that text
+        all_entities = []
+        for text in texts:
+            try:
+                all_entities.append(self.ner_extractor.extract_entities(text))
+            except Exception as e:
+                logger.warning("Error extracting entities: %s", e)
+                all_entities.append(None)
+        return all_entities
+    
     def aggregate_from_text(self,
                            text: str,
                            url: str,
@@ -151,8 +323,18 @@ class NewsAggregator:
         Returns:
             Rectified document dictionary
         """
-        # Step 1: Extract entities using NER
-        entities = self.ner_extractor.extract_entities(text)
+        if not text or len(text.strip()) < self.MIN_TEXT_LENGTH:
+            raise ValueError(f"Insufficient text provided for {url}")
+        
+        # Step 1: Extract entities using NER (spaCy memory grows with text length)
+        ner_text = text
+        nlp = getattr(self.ner_extractor, "nlp", None)
+        if nlp is not None:
+            max_length = min(self.MAX_NER_TEXT_LENGTH, nlp.max_length - 1)
+            if len(text) > max_length:
+                logger.info("Truncating text for %s from %d to %d characters for NER", url, len(text), max_length)
+                ner_text = text[:max_length]
+        entities = self.ner_extractor.extract_entities(ner_text)
         
         # Step 2: Rectify entities with TF-IDF weights
         rectified = self.rectifier.rectify(
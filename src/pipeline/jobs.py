@@ -0,0 +1,196 @@
+"""
+Background job queue for running aggregation work outside the request cycle
+"""
+
+import os
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class JobQueue:
+    """
+    Background job queue backed by a thread pool.
+    Tracks job status and results so clients can poll for completion, in memory
+    or in a MongoDB collection shared by all API worker processes.
+    """
+    
+    # Seconds between heartbeats of the jobs of this process (persisted jobs only)
+    HEARTBEAT_INTERVAL_SECONDS = 10
+    
+    # Queued or running jobs without a heartbeat for this long are reported as
+    # failed (the process running them stopped)
+    HEARTBEAT_TIMEOUT_SECONDS = 60
+    
+    # Persisted jobs are removed this long after their last update
+    JOB_TTL_SECONDS = 24 * 3600
+    
+    # Fields of persisted jobs that are not returned to callers
+    INTERNAL_FIELDS = ["_id", "updated_at", "heartbeat_at"]
+    
+    def __init__(self, max_workers: Optional[int] = None, max_jobs: int = 1000,
+                 collection: Optional[Collection] = None):
+        """
+        Initialize job queue.
+        
+        Args:
+            max_workers: Number of worker threads (defaults to CPU count)
+            max_jobs: Maximum number of jobs kept in memory for status lookups
+                      (oldest finished are dropped; unused with a collection)
+            collection: MongoDB collection to persist job status in, so any API worker
+                        process can look jobs up and they survive restarts (in memory if None)
+        """
+        self.max_jobs = max_jobs
+        self.collection = collection
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            thread_name_prefix="aggregation-job"
+        )
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # IDs of the unfinished jobs of this process, kept alive by heartbeats
+        self._active_jobs = set()
+        self._stopped = threading.Event()
+        self._heartbeat_thread = None
+        
+        if collection is not None:
+            collection.create_index("job_id", unique=True)
+            collection.create_index("updated_at", expireAfterSeconds=self.JOB_TTL_SECONDS)
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat, name="aggregation-job-heartbeat", daemon=True
+            )
+            self._heartbeat_thread.start()
+    
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        Queue a function call to run in the background.
+        
+        Args:
+            fn: Function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        
+        Returns:
+            Job ID
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        if self.collection is not None:
+            now = datetime.utcnow()
+            with self._lock:
+                self._active_jobs.add(job_id)
+            self.collection.insert_one({**job, "updated_at": now, "heartbeat_at": now})
+        else:
+            with self._lock:
+                self._jobs[job_id] = job
+                self._evict_finished()
+        
+        self.executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a job.
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            Job status dictionary if known, None otherwise
+        """
+        if self.collection is None:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                return dict(job) if job else None
+        
+        job = self.collection.find_one({"job_id": job_id})
+        if job is None:
+            return None
+        
+        # Unfinished jobs whose process stopped will never finish
+        stale_before = datetime.utcnow() - timedelta(seconds=self.HEARTBEAT_TIMEOUT_SECONDS)
+        if job["status"] in ("queued", "running") and job["heartbeat_at"] < stale_before:
+            job["status"] = "failed"
+            job["error"] = "Job was interrupted: the server processing it stopped"
+        
+        for field in self.INTERNAL_FIELDS:
+            job.pop(field, None)
+        return job
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running jobs to finish."""
+        self.executor.shutdown(wait=wait)
+        self._stopped.set()
+        if self._heartbeat_thread is not None and wait:
+            self._heartbeat_thread.join()
+    
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        """Run a job and record its outcome."""
+        self._update(job_id, status="running")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e))
+        else:
+            self._update(job_id, status="finished", result=result)
+    
+    def _update(self, job_id: str, **fields):
+        """Update fields of a tracked job."""
+        if self.collection is not None:
+            if fields.get("status") in ("finished", "failed"):
+                with self._lock:
+                    self._active_jobs.discard(job_id)
+            now = datetime.utcnow()
+            self.collection.update_one(
+                {"job_id": job_id},
+                {"$set": {**fields, "updated_at": now, "heartbeat_at": now}}
+            )
+            return
+        
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+    
+    def _heartbeat(self):
+        """Periodically mark the unfinished jobs of this process as alive."""
+        while not self._stopped.wait(self.HEARTBEAT_INTERVAL_SECONDS):
+            with self._lock:
+                active_jobs = list(self._active_jobs)
+            if not active_jobs:
+                continue
+            try:
+                self.collection.update_many(
+                    {"job_id": {"$in": active_jobs}},
+                    {"$set": {"heartbeat_at": datetime.utcnow()}}
+                )
+            except PyMongoError as e:
+                # Retried on the next beat
+                logger.warning("Job heartbeat failed: %s", e)
+    
+    def _evict_finished(self):
+        """Drop the oldest finished jobs once more than max_jobs are tracked."""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("finished", "failed")
+        ][:excess]:
+            del self._jobs[job_id]
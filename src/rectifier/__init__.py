@@ -2,7 +2,7 @@
 TF-IDF Rectifier module for adding relevance weights to entities
 """
 
-from .tfidf_rectifier import TFIDFRectifier
+from .tfidf_rectifier import TFIDFRectifier, HashingTfidfVectorizer
 
-__all__ = ["TFIDFRectifier"]
+__all__ = ["TFIDFRectifier", "HashingTfidfVectorizer"]
 
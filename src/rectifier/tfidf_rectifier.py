@@ -2,9 +2,136 @@
 TF-IDF Rectifier for adding relevance weights to named entities
 """
 
-from typing import Dict, List, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
+import re
+import math
+import numbers
+import hashlib
+import logging
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Union
+from sklearn.base import clone
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
 import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF vectorizer based on the hashing trick (HashingVectorizer + TfidfTransformer).
+    Keeps no vocabulary dictionary, so memory stays bounded on large corpora.
+    """
+    
+    def __init__(self, n_features: int = 2 ** 18, chunk_size: int = 10_000):
+        """
+        Initialize hashing TF-IDF vectorizer.
+        
+        Args:
+            n_features: Number of hash buckets (columns)
+            chunk_size: Number of texts vectorized at a time while fitting
+        """
+        self.n_features = n_features
+        self.chunk_size = chunk_size
+        self.hashing_vectorizer = HashingVectorizer(
+            n_features=n_features,
+            lowercase=True,
+            analyzer='word',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None
+        )
+        self.transformer = TfidfTransformer()
+    
+    def fit(self, texts: List[str]) -> "HashingTfidfVectorizer":
+        """
+        Fit IDF on a corpus, vectorizing it in chunks.
+        
+        Args:
+            texts: List of texts
+            
+        Returns:
+            The fitted vectorizer itself
+        """
+        self.fit_transform(texts)
+        return self
+    
+    def fit_transform(self, texts: List[str]) -> csr_matrix:
+        """
+        Fit IDF on a corpus and transform it, tokenizing each text only once.
+        
+        Args:
+            texts: List of texts
+            
+        Returns:
+            CSR matrix with one TF-IDF row per text
+        """
+        counts = vstack([
+            self.hashing_vectorizer.transform(texts[start:start + self.chunk_size])
+            for start in range(0, len(texts), self.chunk_size)
+        ]).tocsr()
+        self.document_frequency_ = np.bincount(counts.indices, minlength=self.n_features)
+        return self.transformer.fit_transform(counts)
+    
+    def transform(self, texts: List[str]) -> csr_matrix:
+        """
+        Transform texts to TF-IDF vectors.
+        
+        Args:
+            texts: List of texts
+            
+        Returns:
+            CSR matrix with one TF-IDF row per text
+        """
+        return self.transformer.transform(self.hashing_vectorizer.transform(texts))
+    
+    def build_analyzer(self):
+        """
+        Get the analyzer that splits a text into terms.
+        
+        Returns:
+            Callable mapping a text to its terms (words and word pairs)
+        """
+        return self.hashing_vectorizer.build_analyzer()
+    
+    def idf(self, terms: Iterable[str]) -> np.ndarray:
+        """
+        Get the fitted IDF of terms (of their hash buckets).
+        
+        Args:
+            terms: Terms produced by the analyzer
+            
+        Returns:
+            Array with the IDF of each term (terms unseen in the corpus get the
+            highest IDF of the corpus terms, as with a vocabulary)
+        """
+        columns = [self.term_id(term) for term in terms]
+        seen = self.document_frequency_ > 0
+        max_idf = self.transformer.idf_[seen].max() if seen.any() else 1.0
+        return np.where(seen[columns], self.transformer.idf_[columns], max_idf)
+    
+    def term_id(self, term: str) -> int:
+        """
+        Get the column of a term, as computed by the hashing trick.
+        
+        Args:
+            term: Term produced by the analyzer
+            
+        Returns:
+            Column index in the TF-IDF vectors
+        """
+        h = murmurhash3_32(term, seed=0)
+        if h == -2 ** 31:
+            return (2 ** 31 - 1 - (self.n_features - 1)) % self.n_features
+        return abs(h) % self.n_features
 
 
 class TFIDFRectifier:
@@ -13,14 +140,36 @@ class TFIDFRectifier:
     Converts entity lists to weighted entity dictionaries.
     """
     
-    def __init__(self, min_relevance: float = 0.3):
+    # Number of corpus-fitted vectorizers kept for repeated batch_rectify calls
+    IDF_CACHE_SIZE = 8
+    
+    # Minimum number of distinct entities for which the Aho-Corasick scan is used
+    # (below it, the regex scan is just as fast)
+    AHO_CORASICK_MIN_ENTITIES = 4
+    
+    # Articles with at most this many distinct entities are scored without a vectorizer fit
+    DIRECT_TFIDF_MAX_ENTITIES = 3
+    
+    def __init__(self, min_relevance: float = 0.3,
+                 use_hashing: bool = False,
+                 n_features: int = 2 ** 18,
+                 score_against_corpus: bool = False):
         """
         Initialize TF-IDF Rectifier.
         
         Args:
             min_relevance: Minimum relevance score threshold (entities below this are filtered)
+            use_hashing: Use a HashingTfidfVectorizer (no vocabulary dictionary) in batch_rectify,
+                         for large corpora
+            n_features: Number of hash buckets of the hashing vectorizer
+            score_against_corpus: Use IDF from the running corpus of partial_fit in rectify
+                                  (once it holds two or more texts), so scores depend on
+                                  the texts added so far
         """
         self.min_relevance = min_relevance
+        self.use_hashing = use_hashing
+        self.n_features = n_features
+        self.score_against_corpus = score_against_corpus
         self.vectorizer = TfidfVectorizer(
             lowercase=True,
             analyzer='word',
@@ -28,11 +177,21 @@ class TFIDFRectifier:
             min_df=1,
             max_df=0.95
         )
+        
+        # Corpus-fitted vectorizers keyed by a hash of the corpus (LRU order)
+        self._idf_cache: "OrderedDict[bytes, Union[TfidfVectorizer, HashingTfidfVectorizer]]" = OrderedDict()
+        
+        # Running document frequencies for incremental (streaming) IDF
+        self._document_frequencies: Counter = Counter()
+        self._document_count = 0
+        self._incremental_vectorizer: Optional[TfidfVectorizer] = None
     
     def rectify(self, entities: Dict[str, List[str]], 
                 source_text: str,
                 url: str,
-                filter_low_relevance: bool = True) -> Dict:
+                filter_low_relevance: bool = True,
+                vectorizer: Optional[Union[TfidfVectorizer, HashingTfidfVectorizer]] = None,
+                occurrences: Optional[Dict[str, List[int]]] = None) -> Dict:
         """
         Rectify entity dictionary by adding TF-IDF weights.
         
@@ -41,6 +200,12 @@ class TFIDFRectifier:
             source_text: Original text from which entities were extracted
             url: URL or identifier for the news item
             filter_low_relevance: Whether to filter out entities below min_relevance threshold
+            vectorizer: TF-IDF vectorizer already fitted on a corpus of source texts, whose IDF
+                        is used instead of the IDF of each category's entity contexts (if None,
+                        the running corpus from partial_fit is used when score_against_corpus
+                        is set, otherwise TF-IDF is fitted per category on this article's entity contexts)
+            occurrences: Precomputed start offsets of each entity in the source text
+                         (found with a single scan of the text if None)
             
         Returns:
             Rectified dictionary with URL and weighted entities
@@ -50,17 +215,53 @@ class TFIDFRectifier:
             "entities": {}
         }
         
+        # Locate all entities of all categories in a single pass over the text
+        all_entities = list(dict.fromkeys(
+            entity for entity_list in entities.values() for entity in entity_list
+        ))
+        entities_lower = {entity: entity.lower() for entity in all_entities}
+        if occurrences is None:
+            occurrences = self._find_occurrences(all_entities, source_text.lower(), entities_lower)
+        
+        # Take IDF from the running corpus if requested and there is one. Otherwise
+        # IDF comes from each category's per-entity context documents.
+        if vectorizer is None and self.score_against_corpus and self._document_count > 1:
+            try:
+                vectorizer = self._get_incremental_vectorizer()
+            except ValueError:
+                pass
+        
+        # Entity words are shared by the TF-IDF fits of all categories
+        entity_words = {entity: entities_lower[entity].split() for entity in all_entities}
+        
         # Process each entity category
         for category, entity_list in entities.items():
             if not entity_list:
                 rectified["entities"][category] = []
                 continue
             
-            # Calculate TF-IDF scores for entities in this category
+            # Calculate TF-IDF scores for the entities in this category (fitted per
+            # category, so entities are only weighed against their peers)
+            tfidf_scores = None
+            try:
+                tfidf_scores = self._tfidf_scores(
+                    list(dict.fromkeys(entity_list)), source_text, occurrences,
+                    vectorizer, entity_words
+                )
+            except ValueError as e:
+                # e.g. a single entity: every term is pruned by max_df
+                logger.debug("TF-IDF fit failed for %s, using frequency-based scoring: %s", category, e)
+            except Exception as e:
+                # Fallback: use simple frequency-based scoring
+                logger.warning("TF-IDF calculation failed, using frequency-based scoring: %s", e)
+            
+            # Weight the entities in this category
             weighted_entities = self._calculate_weights(
                 entity_list, 
                 source_text, 
-                category
+                category,
+                occurrences,
+                tfidf_scores
             )
             
             # Filter low relevance entities if requested
@@ -77,9 +278,279 @@ class TFIDFRectifier:
         
         return rectified
     
+    def _find_occurrences(self, entities: List[str],
+                          source_lower: str,
+                          entities_lower: Optional[Dict[str, str]] = None) -> Dict[str, List[int]]:
+        """
+        Find the start offsets of all (possibly overlapping) case-insensitive
+        occurrences of each entity in a single scan of the text.
+        
+        Args:
+            entities: List of entity values
+            source_lower: Lowercased source text
+            entities_lower: Lowercased form of each entity (computed if None)
+            
+        Returns:
+            Dictionary mapping entities (as given) to their start offsets in the text
+        """
+        if entities_lower is None:
+            entities_lower = {entity: entity.lower() for entity in entities}
+        entities_lower = {entity: entities_lower[entity] for entity in entities if entity}
+        occurrences_lower = self._scan_occurrences(entities_lower.values(), source_lower)
+        return {entity: occurrences_lower[entity_lower] for entity, entity_lower in entities_lower.items()}
+    
+    def _scan_occurrences(self, entities_lower: Iterable[str], source_lower: str) -> Dict[str, List[int]]:
+        """
+        Scan the text once for all occurrences of lowercased entities.
+        
+        Args:
+            entities_lower: Lowercased entity values
+            source_lower: Lowercased source text
+            
+        Returns:
+            Dictionary mapping lowercased entities to their start offsets in the text
+        """
+        entities_lower = sorted(set(entities_lower), key=len, reverse=True)
+        occurrences = {entity: [] for entity in entities_lower}
+        if not entities_lower:
+            return occurrences
+        
+        if ahocorasick is not None and len(entities_lower) >= self.AHO_CORASICK_MIN_ENTITIES:
+            # Aho-Corasick reports every match, overlapping ones included, by end offset
+            automaton = ahocorasick.Automaton()
+            for entity in entities_lower:
+                automaton.add_word(entity, entity)
+            automaton.make_automaton()
+            
+            for end, entity in automaton.iter(source_lower):
+                occurrences[entity].append(end - len(entity) + 1)
+            for offsets in occurrences.values():
+                offsets.sort()
+            
+            return occurrences
+        
+        # A lookahead alternation (longest first) matches the longest entity at every
+        # offset; shorter entities matching at the same offset are its prefixes
+        prefixes = {
+            entity: [other for other in entities_lower if other != entity and entity.startswith(other)]
+            for entity in entities_lower
+        }
+        pattern = re.compile("(?=(" + "|".join(map(re.escape, entities_lower)) + "))")
+        
+        for match in pattern.finditer(source_lower):
+            start = match.start()
+            entity = match.group(1)
+            occurrences[entity].append(start)
+            for prefix in prefixes[entity]:
+                occurrences[prefix].append(start)
+        
+        return occurrences
+    
+    def _tfidf_scores(self, entities: List[str],
+                      source_text: str,
+                      occurrences: Dict[str, List[int]],
+                      vectorizer: Optional[Union[TfidfVectorizer, HashingTfidfVectorizer]] = None,
+                      entity_words: Optional[Dict[str, List[str]]] = None) -> Dict[str, float]:
+        """
+        Calculate the TF-IDF score (0-1) of each entity.
+        
+        Each entity gets one document (entity text + context from source), which
+        measures how important the entity is in the context. Without a corpus, the
+        vectorizer is fitted on these documents; with a corpus-fitted vectorizer, the
+        documents are weighted with term counts and the corpus IDF instead. The scores
+        of all entities are computed with sparse matrix operations over their term
+        ids, or directly from term counts when there are only a few entities.
+        
+        Args:
+            entities: List of unique entity values
+            source_text: Source text containing the entities
+            occurrences: Entity occurrence offsets from _find_occurrences
+            vectorizer: TF-IDF vectorizer already fitted on a corpus (optional)
+            entity_words: Lowercased words of each entity (computed if None)
+            
+        Returns:
+            Dictionary mapping entities to their TF-IDF scores
+        """
+        if entity_words is None:
+            entity_words = {entity: entity.lower().split() for entity in entities}
+        
+        # Create documents: one per entity (entity text + context from source)
+        # (50 chars before and after each occurrence, or the entity itself if not found)
+        documents = []
+        for entity in entities:
+            contexts = [
+                source_text[max(0, idx - 50):min(len(source_text), idx + len(entity) + 50)]
+                for idx in occurrences.get(entity, ())
+            ]
+            documents.append(" ".join(contexts) if contexts else entity)
+        
+        if vectorizer is None and len(documents) <= self.DIRECT_TFIDF_MAX_ENTITIES:
+            # Too few documents to be worth building sparse matrices for
+            avg_scores = self._direct_tfidf_scores(entities, documents, entity_words)
+        else:
+            if vectorizer is None:
+                # Fit and transform documents (row i belongs to entity i)
+                tfidf_matrix = self.vectorizer.fit_transform(documents)
+                vocabulary = self.vectorizer.vocabulary_
+            else:
+                # Count terms with the same vocabulary pruning as a fit on the documents,
+                # then weight them with the corpus IDF
+                counter = clone(self.vectorizer).set_params(use_idf=False, norm=None)
+                counts = counter.fit_transform(documents)
+                vocabulary = counter.vocabulary_
+                idf = self._corpus_idf(vectorizer, counter.get_feature_names_out())
+                tfidf_matrix = normalize(counts.multiply(idf).tocsr())
+            
+            # Sum the scores of the terms (words and word pairs) of each entity name
+            term_matrix = self._entity_term_matrix(entities, vocabulary, entity_words)
+            entity_scores = np.asarray(tfidf_matrix.multiply(term_matrix).sum(axis=1)).ravel()
+            max_scores = tfidf_matrix.max(axis=1).toarray().ravel()
+            avg_scores = self._average_term_scores(entity_scores, max_scores, term_matrix)
+        
+        # Normalize to 0-1 range (TF-IDF can be > 1, but we want 0-1)
+        normalized_scores = np.minimum(1.0, avg_scores * 2)
+        return dict(zip(entities, normalized_scores.tolist()))
+    
+    def _corpus_idf(self, vectorizer: Union[TfidfVectorizer, HashingTfidfVectorizer],
+                    terms: Iterable[str]) -> np.ndarray:
+        """
+        Look up the IDF of terms in a corpus-fitted vectorizer.
+        
+        Args:
+            vectorizer: TF-IDF vectorizer fitted on a corpus
+            terms: Terms produced by the analyzer
+            
+        Returns:
+            Array with the IDF of each term (terms unseen in the corpus get the highest IDF)
+        """
+        if isinstance(vectorizer, HashingTfidfVectorizer):
+            return vectorizer.idf(terms)
+        
+        vocabulary = vectorizer.vocabulary_
+        max_idf = vectorizer.idf_.max()
+        return np.array([
+            vectorizer.idf_[vocabulary[term]] if term in vocabulary else max_idf
+            for term in terms
+        ])
+    
+    def _average_term_scores(self, entity_scores: np.ndarray,
+                             max_scores: np.ndarray,
+                             term_matrix: csr_matrix) -> np.ndarray:
+        """
+        Average summed term scores over each entity's number of terms.
+        
+        Args:
+            entity_scores: Sum of the TF-IDF scores of each entity's terms
+            max_scores: Maximum TF-IDF score in each entity's document
+            term_matrix: Entity term matrix from _entity_term_matrix
+            
+        Returns:
+            Average score of each entity (the maximum document score for entities without known terms)
+        """
+        term_counts = np.diff(term_matrix.indptr)
+        return np.where(
+            term_counts > 0,
+            entity_scores / np.maximum(term_counts, 1),
+            max_scores
+        )
+    
+    def _direct_tfidf_scores(self, entities: List[str],
+                             documents: List[str],
+                             entity_words: Dict[str, List[str]]) -> np.ndarray:
+        """
+        Score entities against a handful of per-entity documents directly from
+        term counts, with the same vocabulary pruning, smoothed IDF and L2
+        normalization as fitting the vectorizer on the documents.
+        
+        Args:
+            entities: List of unique entity values
+            documents: One document per entity
+            entity_words: Lowercased words of each entity
+            
+        Returns:
+            Average TF-IDF score of each entity's terms in its document
+        """
+        analyzer = self.vectorizer.build_analyzer()
+        term_counts = [Counter(analyzer(document)) for document in documents]
+        document_frequencies = Counter(term for counts in term_counts for term in counts)
+        if not document_frequencies:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        
+        n_documents = len(documents)
+        max_df, min_df = self.vectorizer.max_df, self.vectorizer.min_df
+        max_count = max_df if isinstance(max_df, numbers.Integral) else max_df * n_documents
+        min_count = min_df if isinstance(min_df, numbers.Integral) else min_df * n_documents
+        idf = {
+            term: math.log((1 + n_documents) / (1 + df)) + 1
+            for term, df in document_frequencies.items()
+            if min_count <= df <= max_count
+        }
+        if not idf:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        term_index = self._build_token_index({term: term for term in idf})
+        
+        avg_scores = np.zeros(len(entities))
+        for i, (entity, counts) in enumerate(zip(entities, term_counts)):
+            weights = {term: count * idf[term] for term, count in counts.items() if term in idf}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            entity_terms = set().union(*(term_index.get(word, ()) for word in entity_words[entity]))
+            if entity_terms:
+                avg_scores[i] = sum(weights.get(term, 0.0) for term in entity_terms) / len(entity_terms)
+            else:
+                avg_scores[i] = max(weights.values(), default=0.0)
+            if norm > 0:
+                avg_scores[i] /= norm
+        
+        return avg_scores
+    
+    def _entity_term_matrix(self, entities: List[str],
+                            vocabulary: Dict[str, int],
+                            entity_words: Dict[str, List[str]]) -> csr_matrix:
+        """
+        Build a sparse indicator matrix of the vocabulary terms matching each entity name.
+        
+        Args:
+            entities: List of entity values
+            vocabulary: Vocabulary of a fitted vectorizer (term -> column)
+            entity_words: Lowercased words of each entity
+            
+        Returns:
+            CSR matrix with one row per entity and one column per vocabulary term
+        """
+        # All terms (words and word pairs) containing a word of the entity name
+        token_index = self._build_token_index(vocabulary)
+        indptr = [0]
+        indices = []
+        for entity in entities:
+            indices.extend(set().union(*(token_index.get(word, ()) for word in entity_words[entity])))
+            indptr.append(len(indices))
+        
+        return csr_matrix(
+            (np.ones(len(indices)), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(entities), len(vocabulary))
+        )
+    
+    def _build_token_index(self, vocabulary: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """
+        Index vocabulary terms (words and word pairs) by the words they contain.
+        
+        Args:
+            vocabulary: Dictionary mapping terms to values (e.g. columns)
+            
+        Returns:
+            Dictionary mapping words to the values of the terms containing them
+        """
+        index = defaultdict(list)
+        for term, value in vocabulary.items():
+            for word in set(term.split()):
+                index[word].append(value)
+        return dict(index)
+    
     def _calculate_weights(self, entities: List[str], 
                           source_text: str,
-                          category: str) -> List[Dict[str, any]]:
+                          category: str,
+                          occurrences: Dict[str, List[int]],
+                          tfidf_scores: Optional[Dict[str, float]]) -> List[Dict[str, any]]:
         """
         Calculate TF-IDF weights for a list of entities.
         
@@ -87,6 +558,8 @@ class TFIDFRectifier:
             entities: List of entity values
             source_text: Source text containing the entities
             category: Entity category name
+            occurrences: Entity occurrence offsets from _find_occurrences
+            tfidf_scores: Entity TF-IDF scores from _tfidf_scores (None if TF-IDF failed)
             
         Returns:
             List of dictionaries with "key" and "value" (weight)
@@ -94,143 +567,150 @@ class TFIDFRectifier:
         if not entities:
             return []
         
-        # Create documents: one per entity (entity text + context from source)
-        # This helps measure how important each entity is in the context
-        documents = []
-        entity_texts = []
+        if tfidf_scores is None:
+            return self._frequency_based_scoring(entities, source_text, occurrences)
         
+        weighted_entities = []
         for entity in entities:
-            # Create a document that includes the entity and surrounding context
-            # This helps TF-IDF understand the entity's importance
-            entity_lower = entity.lower()
-            source_lower = source_text.lower()
-            
-            # Find all occurrences of the entity in the text
-            occurrences = []
-            start = 0
-            while True:
-                idx = source_lower.find(entity_lower, start)
-                if idx == -1:
-                    break
-                # Extract context around the entity (50 chars before and after)
-                context_start = max(0, idx - 50)
-                context_end = min(len(source_text), idx + len(entity) + 50)
-                context = source_text[context_start:context_end]
-                occurrences.append(context)
-                start = idx + 1
-            
-            # If entity found, use contexts; otherwise use entity itself
-            if occurrences:
-                doc = " ".join(occurrences)
-            else:
-                doc = entity
-            
-            documents.append(doc)
-            entity_texts.append(entity)
-        
-        # Calculate TF-IDF
-        try:
-            # Fit and transform documents
-            tfidf_matrix = self.vectorizer.fit_transform(documents)
-            
-            # Get feature names (terms)
-            feature_names = self.vectorizer.get_feature_names_out()
-            
-            # Calculate average TF-IDF score for each entity
-            weighted_entities = []
-            for i, entity in enumerate(entity_texts):
-                # Get TF-IDF scores for this document
-                scores = tfidf_matrix[i].toarray()[0]
-                
-                # Calculate entity-specific score
-                # Sum scores for words that appear in the entity name
-                entity_words = set(entity.lower().split())
-                entity_score = 0.0
-                word_count = 0
-                
-                for j, term in enumerate(feature_names):
-                    if term in entity_words or any(word in term for word in entity_words):
-                        entity_score += scores[j]
-                        word_count += 1
-                
-                # Normalize score (average, then scale to 0-1 range)
-                if word_count > 0:
-                    avg_score = entity_score / word_count
-                else:
-                    # Fallback: use maximum score in document
-                    avg_score = np.max(scores) if len(scores) > 0 else 0.0
-                
-                # Normalize to 0-1 range (TF-IDF can be > 1, but we want 0-1)
-                normalized_score = min(1.0, avg_score * 2)  # Scale factor to bring into 0-1 range
-                
-                # Boost score based on frequency in source text
-                frequency_boost = min(1.0, source_text.lower().count(entity.lower()) * 0.1)
-                final_score = min(1.0, normalized_score + frequency_boost * 0.2)
-                
-                weighted_entities.append({
-                    "key": entity,
-                    "value": round(final_score, 2)
-                })
-        
-        except Exception as e:
-            # Fallback: use simple frequency-based scoring
-            print(f"TF-IDF calculation failed, using frequency-based scoring: {e}")
-            weighted_entities = self._frequency_based_scoring(entities, source_text)
+            # Boost score based on frequency in source text
+            frequency_boost = min(1.0, len(occurrences.get(entity, ())) * 0.1)
+            final_score = min(1.0, tfidf_scores[entity] + frequency_boost * 0.2)
+            
+            weighted_entities.append({
+                "key": entity,
+                "value": round(final_score, 2)
+            })
         
         return weighted_entities
     
     def _frequency_based_scoring(self, entities: List[str], 
-                                source_text: str) -> List[Dict[str, any]]:
+                                source_text: str,
+                                occurrences: Optional[Dict[str, List[int]]] = None) -> List[Dict[str, any]]:
         """
         Fallback scoring method based on entity frequency in text.
         
         Args:
             entities: List of entity values
             source_text: Source text
+            occurrences: Entity occurrence offsets from _find_occurrences (computed if None)
             
         Returns:
             List of dictionaries with "key" and "value" (weight)
         """
-        source_lower = source_text.lower()
-        text_length = len(source_text.split())
+        if occurrences is None:
+            occurrences = self._find_occurrences(entities, source_text.lower())
         
-        weighted_entities = []
-        max_freq = 0
+        # Calculate frequencies (once per distinct entity)
+        unique_entities = list(dict.fromkeys(entities))
+        frequencies = np.fromiter(
+            (len(occurrences.get(entity, ())) for entity in unique_entities),
+            dtype=np.int32,
+            count=len(unique_entities)
+        )
         
-        # Calculate frequencies
-        frequencies = {}
-        for entity in entities:
-            freq = source_lower.count(entity.lower())
-            frequencies[entity] = freq
-            max_freq = max(max_freq, freq)
-        
-        # Normalize frequencies to 0-1 range
-        for entity, freq in frequencies.items():
-            if max_freq > 0:
-                score = freq / max_freq
-            else:
-                score = 0.5  # Default score if no frequency data
+        # Normalize frequencies to 0-1 range (default score if no frequency data)
+        max_freq = frequencies.max() if len(frequencies) > 0 else 0
+        scores = frequencies / max_freq if max_freq > 0 else np.full(len(frequencies), 0.5)
+        
+        return [
+            {"key": entity, "value": round(score, 2)}
+            for entity, score in zip(unique_entities, scores.tolist())
+        ]
+    
+    def partial_fit(self, source_texts: List[str]) -> "TFIDFRectifier":
+        """
+        Add a batch of source texts to the running document frequencies used
+        for incremental IDF (see batch_rectify with incremental=True). With
+        score_against_corpus set, once two or more texts have been added, rectify
+        also uses their IDF.
+        
+        Args:
+            source_texts: List of source texts
             
-            weighted_entities.append({
-                "key": entity,
-                "value": round(score, 2)
-            })
+        Returns:
+            The rectifier itself
+        """
+        analyzer = self.vectorizer.build_analyzer()
+        for text in source_texts:
+            self._document_frequencies.update(set(analyzer(text)))
+        self._document_count += len(source_texts)
+        self._incremental_vectorizer = None
         
-        return weighted_entities
+        return self
+    
+    def _get_incremental_vectorizer(self) -> TfidfVectorizer:
+        """
+        Build a vectorizer whose vocabulary and IDF come from the running document
+        frequencies (with the same smoothed IDF as a regular fit). Only its IDF is
+        used, so no terms are pruned: terms common to the corpus get a low IDF instead.
+        
+        Returns:
+            Fitted TF-IDF vectorizer
+        """
+        if self._incremental_vectorizer is None:
+            terms = sorted(self._document_frequencies)
+            if not terms:
+                raise ValueError("empty vocabulary; no texts were added with partial_fit")
+            
+            vectorizer = clone(self.vectorizer).set_params(vocabulary={term: i for i, term in enumerate(terms)})
+            document_frequencies = np.array([self._document_frequencies[term] for term in terms], dtype=np.float64)
+            vectorizer.idf_ = np.log((1 + self._document_count) / (1 + document_frequencies)) + 1
+            self._incremental_vectorizer = vectorizer
+        
+        return self._incremental_vectorizer
+    
+    def _get_corpus_vectorizer(self, source_texts: List[str]) -> Union[TfidfVectorizer, HashingTfidfVectorizer]:
+        """
+        Get a vectorizer fitted on the given corpus, reusing the fit from an earlier
+        call on the same corpus. Only its IDF is used, so no terms are pruned: terms
+        common to the corpus get a low IDF instead.
+        
+        Args:
+            source_texts: List of source texts
+            
+        Returns:
+            Fitted TF-IDF vectorizer
+        """
+        corpus_hash = hashlib.blake2b()
+        for text in source_texts:
+            corpus_hash.update(text.encode("utf-8", "surrogatepass"))
+            corpus_hash.update(b"\x00")
+        key = corpus_hash.digest()
+        
+        cached = self._idf_cache.get(key)
+        if cached is not None:
+            self._idf_cache.move_to_end(key)
+            return cached
+        
+        if self.use_hashing:
+            vectorizer = HashingTfidfVectorizer(n_features=self.n_features)
+        else:
+            vectorizer = clone(self.vectorizer).set_params(max_df=1.0)
+        vectorizer.fit(source_texts)
+        self._idf_cache[key] = vectorizer
+        while len(self._idf_cache) > self.IDF_CACHE_SIZE:
+            self._idf_cache.popitem(last=False)
+        
+        return vectorizer
     
     def batch_rectify(self, entity_dicts: List[Dict[str, List[str]]],
                      source_texts: List[str],
                      urls: List[str],
-                     filter_low_relevance: bool = True) -> List[Dict]:
+                     filter_low_relevance: bool = True,
+                     incremental: bool = False) -> List[Dict]:
         """
         Rectify multiple entity dictionaries in batch.
-        This is more efficient as it can use corpus-level TF-IDF.
+        IDF is fitted once on the corpus of source texts, so it reflects the whole
+        batch; entities are still scored on their context documents, as in rectify.
+        Fits are cached, so repeated calls on the same corpus do not refit.
         
         Args:
             entity_dicts: List of entity dictionaries
             source_texts: List of source texts
             urls: List of URLs
             filter_low_relevance: Whether to filter low relevance entities
+            incremental: Add the texts to the running document frequencies and use
+                         IDF over all batches seen so far (for streaming ingestion)
             
         Returns:
             List of rectified dictionaries
@@ -238,10 +718,23 @@ class TFIDFRectifier:
         if len(entity_dicts) != len(source_texts) or len(entity_dicts) != len(urls):
             raise ValueError("All input lists must have the same length")
         
+        # Fit IDF once on the whole corpus
+        vectorizer = None
+        if incremental:
+            self.partial_fit(source_texts)
+        if incremental or len(source_texts) > 1:
+            try:
+                if incremental:
+                    vectorizer = self._get_incremental_vectorizer()
+                else:
+                    vectorizer = self._get_corpus_vectorizer(source_texts)
+            except ValueError as e:
+                # e.g. an empty vocabulary; use the IDF of each article's contexts instead
+                logger.warning("Corpus TF-IDF fit failed, fitting per article: %s", e)
+        
         rectified_list = []
         for entities, text, url in zip(entity_dicts, source_texts, urls):
-            rectified = self.rectify(entities, text, url, filter_low_relevance)
+            rectified = self.rectify(entities, text, url, filter_low_relevance, vectorizer)
             rectified_list.append(rectified)
         
         return rectified_list
-
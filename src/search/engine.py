@@ -5,6 +5,7 @@ Search Engine for querying news articles using NER-based Boolean search
 from typing import Dict, List, Optional
 from ..ner.extractor import NERExtractor
 from ..database.nosql_db import NoSQLDatabase
+from ..utils.cache import TTLCache, cached
 
 
 class SearchEngine:
@@ -16,7 +17,9 @@ class SearchEngine:
     def __init__(self, 
                  database: NoSQLDatabase,
                  ner_extractor: Optional[NERExtractor] = None,
-                 default_relevance_threshold: float = 0.4):
+                 default_relevance_threshold: float = 0.4,
+                 entity_cache_size: int = 1024,
+                 entity_cache_ttl: float = 60.0):
         """
         Initialize search engine.
         
@@ -24,10 +27,15 @@ class SearchEngine:
             database: NoSQL database instance
             ner_extractor: NER extractor instance (creates new if None)
             default_relevance_threshold: Default minimum relevance score
+            entity_cache_size: Maximum number of queries whose extracted entities are cached
+            entity_cache_ttl: Time-to-live of cached query entities in seconds
         """
         self.database = database
         self.ner_extractor = ner_extractor or NERExtractor()
         self.default_relevance_threshold = default_relevance_threshold
+        
+        # Entities of recent queries, so repeated queries skip NER
+        self._entity_cache = TTLCache(max_size=entity_cache_size, ttl_seconds=entity_cache_ttl)
     
     def search(self, 
                query: str,
@@ -45,7 +53,7 @@ class SearchEngine:
             List of matching documents with relevance scores
         """
         # Extract entities from query
-        entities = self.ner_extractor.extract_entities(query)
+        entities = self.extract_query_entities(query)
         
         # Build query parameters
         query_params = {}
@@ -74,6 +82,19 @@ class SearchEngine:
         
         return results
     
+    @cached("_entity_cache", key=lambda self, query: query.strip())
+    def extract_query_entities(self, query: str) -> Dict[str, List[str]]:
+        """
+        Extract entities from a query (cached per query string).
+        
+        Args:
+            query: Search query string
+            
+        Returns:
+            Dictionary of entity categories to lists of entity values
+        """
+        return self.ner_extractor.extract_entities(query.strip())
+    
     def search_with_entities(self,
                             query_entities: Dict[str, List[str]],
                             relevance_thresholds: Optional[Dict[str, float]] = None,
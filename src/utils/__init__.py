@@ -0,0 +1,7 @@
+"""
+Shared utilities
+"""
+
+from .cache import TTLCache, cached, freeze
+
+__all__ = ["TTLCache", "cached", "freeze"]
@@ -0,0 +1,148 @@
+"""
+Thread-safe in-process LRU cache with TTL
+"""
+
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after a fixed TTL.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 30.0):
+        """
+        Initialize cache.
+        
+        Args:
+            max_size: Maximum number of entries (least recently used are evicted first)
+            ttl_seconds: Time-to-live for entries in seconds
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Bumped on every invalidation so in-flight reads can detect it
+        self.generation = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value, refreshing its recency.
+        
+        Args:
+            key: Cache key
+            default: Value returned if key is missing or expired
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Store a value, evicting the least recently used entry on overflow.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            generation: If given, only store when no invalidation happened since
+                        this generation was read
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry, returning its value if present."""
+        with self._lock:
+            self.generation += 1
+            entry = self._entries.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def cached(cache_attr: str, key: Callable[..., Optional[Hashable]]):
+    """
+    Cache the result of an instance method in a TTLCache attribute of the instance.
+    
+    Values are deep-copied on store and on hit so callers can mutate results freely.
+    A result is not stored if the cache was invalidated while the method ran, so a
+    read that raced with a write cannot cache pre-write data.
+    
+    Args:
+        cache_attr: Name of the instance attribute holding the TTLCache
+        key: Function receiving the method arguments (including self) and returning
+             the cache key, or None if the call should bypass the cache
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: TTLCache = getattr(self, cache_attr)
+            cache_key = key(self, *args, **kwargs)
+            if cache_key is None:
+                return method(self, *args, **kwargs)
+            
+            value = cache.get(cache_key, _MISSING)
+            if value is _MISSING:
+                generation = cache.generation
+                value = method(self, *args, **kwargs)
+                cache.set(cache_key, copy.deepcopy(value), generation=generation)
+                return value
+            
+            return copy.deepcopy(value)
+        
+        return wrapper
+    
+    return decorator
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Convert nested dicts/lists into a hashable representation for use in cache keys.
+    
+    Args:
+        value: Value to convert
+    
+    Returns:
+        Hashable equivalent of value
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        # Sort so equal sets always produce the same key regardless of iteration order
+        return tuple(sorted((freeze(v) for v in value), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
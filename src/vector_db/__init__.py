@@ -3,6 +3,7 @@ Vector database module for caching search queries and results
 """
 
 from .cache import VectorCache
+from .query_store import QueryStore
 
-__all__ = ["VectorCache"]
+__all__ = ["VectorCache", "QueryStore"]
 
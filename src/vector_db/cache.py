@@ -3,11 +3,174 @@ Vector database cache for storing and retrieving similar search queries
 """
 
 import os
+import copy
+import time
+import base64
+import asyncio
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from chromadb.utils import embedding_functions
+from functools import lru_cache
+from typing import Any, Callable, List, Dict, Optional
+from datetime import datetime, timezone
 import json
+from ..utils.cache import TTLCache
+import numpy as np
+from .query_store import QueryStore
+from .thresholds import RegionThresholds
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Prefixes of msgpack-encoded (optionally zstd-compressed) result metadata.
+# Chroma metadata values cannot be bytes, so the payload is base64-encoded;
+# values without a prefix are JSON (the format used before msgpack).
+MSGPACK_PREFIX = "mp:"
+MSGPACK_ZSTD_PREFIX = "mpz:"
+
+# Serialized results at least this large are zstd-compressed
+COMPRESS_MIN_BYTES = 1024
+
+
+def encode_results(results: List[Dict]) -> str:
+    """
+    Serialize search results for storage in collection metadata.
+    
+    Args:
+        results: Search results
+        
+    Returns:
+        msgpack (zstd-compressed if large) in base64 with a format prefix,
+        or JSON if msgpack is not installed
+    """
+    if msgpack is None:
+        return json.dumps(results, default=str)
+    
+    payload = msgpack.packb(results, default=str)
+    if zstandard is not None and len(payload) >= COMPRESS_MIN_BYTES:
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+        return MSGPACK_ZSTD_PREFIX + base64.b64encode(payload).decode("ascii")
+    return MSGPACK_PREFIX + base64.b64encode(payload).decode("ascii")
+
+
+def decode_results(value: str) -> List[Dict]:
+    """
+    Deserialize search results stored by encode_results (or as plain JSON).
+    
+    Args:
+        value: Serialized results
+        
+    Returns:
+        Search results
+    """
+    if value.startswith(MSGPACK_ZSTD_PREFIX):
+        payload = zstandard.ZstdDecompressor().decompress(base64.b64decode(value[len(MSGPACK_ZSTD_PREFIX):]))
+        return msgpack.unpackb(payload, raw=False)
+    if value.startswith(MSGPACK_PREFIX):
+        return msgpack.unpackb(base64.b64decode(value[len(MSGPACK_PREFIX):]), raw=False)
+    return json.loads(value)
+
+
+class AsyncBatcher:
+    """
+    Collects items submitted by concurrent coroutines and processes them in batches.
+    A batch is flushed when it reaches max_batch_size or after max_wait_seconds.
+    """
+    
+    def __init__(self,
+                 batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16,
+                 max_wait_seconds: float = 0.005):
+        """
+        Initialize batcher.
+        
+        Args:
+            batch_fn: Blocking function mapping a list of items to a list of results
+                      (run in the default executor)
+            max_batch_size: Maximum number of items per batch
+            max_wait_seconds: Maximum time to wait for a batch to fill
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def submit(self, item: Any) -> Any:
+        """
+        Submit an item and wait for its result.
+        
+        Args:
+            item: Item to process
+            
+        Returns:
+            Result of batch_fn for the item
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def aclose(self):
+        """Stop the worker task and cancel items still waiting for a result."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+    
+    async def _run(self):
+        """Drain the queue in batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_wait_seconds
+                
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                
+                items = [item for item, _ in batch]
+                try:
+                    results = await loop.run_in_executor(None, self.batch_fn, items)
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            # Do not leave submitters of an interrupted batch waiting forever
+            for _, future in batch:
+                future.cancel()
 
 
 class VectorCache:
@@ -16,10 +179,23 @@ class VectorCache:
     Enables semantic similarity search for query caching.
     """
     
+    # HNSW index configuration for the approximate nearest-neighbour lookup
+    # (applied when the collection is created)
+    COLLECTION_METADATA = {
+        "hnsw:space": "cosine",
+        "hnsw:construction_ef": 200,
+        "hnsw:M": 16,
+        "hnsw:search_ef": 50
+    }
+    
     def __init__(self,
                  db_path: Optional[str] = None,
                  collection_name: str = "search_cache",
-                 ttl_seconds: int = 3600):
+                 ttl_seconds: int = 3600,
+                 query_store: Optional[QueryStore] = None,
+                 refit_interval: int = 100,
+                 centroid_threshold: float = 0.86,
+                 lookup_cache_size: int = 1024):
         """
         Initialize vector cache.
         
@@ -27,10 +203,30 @@ class VectorCache:
             db_path: Path to ChromaDB database (defaults to env var or ./chroma_db)
             collection_name: Name of the collection
             ttl_seconds: Time-to-live for cached entries in seconds
+            query_store: Persistent store for memoizing query embeddings across restarts
+            refit_interval: Number of stored queries between re-clustering of similarity regions
+            centroid_threshold: Minimum similarity for a stored query to be merged into an
+                                existing cache entry (centroid) instead of creating a new one
+            lookup_cache_size: Number of exact query strings whose similarity lookup hits are
+                               memoized in-process
         """
         self.db_path = db_path or os.getenv("CHROMA_DB_PATH", "./chroma_db")
         self.collection_name = collection_name
         self.ttl_seconds = int(os.getenv("VECTOR_CACHE_TTL", str(ttl_seconds)))
+        self.query_store = query_store
+        self.centroid_threshold = centroid_threshold
+        
+        # Embeddings are computed here (same model as the collection default)
+        # so they can be memoized in-process and in the query store
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self._embed = lru_cache(maxsize=10000)(self._compute_embedding)
+        
+        # Batches embedding computation across concurrent async lookups
+        self._embedding_batcher = AsyncBatcher(self._compute_embeddings)
+        
+        # Hits of find_similar_query for exact query strings, so repeated queries
+        # skip the embedding and the collection query (invalidated on writes)
+        self._lookup_cache = TTLCache(max_size=lookup_cache_size, ttl_seconds=self.ttl_seconds)
         
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
@@ -41,8 +237,14 @@ class VectorCache:
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata=self.COLLECTION_METADATA
         )
+        
+        # Per-region similarity thresholds learned from verified cache hits
+        self.region_thresholds = RegionThresholds()
+        self.refit_interval = refit_interval
+        self._stores_since_refit = 0
+        self.refit_regions()
     
     def store_query(self,
                    query: str,
@@ -50,6 +252,9 @@ class VectorCache:
                    query_entities: Optional[Dict] = None) -> str:
         """
         Store a search query and its results in the cache.
+        Cache entries are centroids: a query close enough to an existing entry is
+        merged into it (incremental mean of the embeddings, latest results kept)
+        instead of being stored as a new vector.
         
         Args:
             query: Search query string
@@ -59,30 +264,215 @@ class VectorCache:
         Returns:
             Cache entry ID
         """
-        # Create metadata
+        return self.store_queries([query], [results], [query_entities])[0]
+    
+    def store_queries(self,
+                      queries: List[str],
+                      results_list: List[List[Dict]],
+                      query_entities_list: Optional[List[Optional[Dict]]] = None) -> List[str]:
+        """
+        Store several search queries and their results in the cache, with one
+        embedding call, one nearest-centroid query and one write per kind of change.
+        Queries are merged into centroids in order, as if stored one at a time
+        (including into centroids created earlier in the same batch).
+        
+        Args:
+            queries: Search query strings
+            results_list: Search results for each query
+            query_entities_list: Extracted entities for each query
+            
+        Returns:
+            Cache entry IDs (in input order)
+        """
+        if query_entities_list is None:
+            query_entities_list = [None] * len(queries)
+        if len(queries) != len(results_list) or len(queries) != len(query_entities_list):
+            raise ValueError("All input lists must have the same length")
+        if not queries:
+            return []
+        
+        embeddings = self._embed_many(queries)
+        self._lookup_cache.clear()
+        
+        # Nearest existing centroid of each query
+        nearest = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=1,
+            include=["embeddings", "metadatas", "distances"]
+        )
+        
+        # Centroids written by this batch: id -> {"embedding", "count", "metadata", "document"}
+        # ("document" is only set for centroids added by this batch)
+        centroids: Dict[str, Dict] = {}
+        doc_ids = []
+        
+        for i, (query, embedding) in enumerate(zip(queries, embeddings)):
+            metadata = self._query_metadata(query, results_list[i], query_entities_list[i])
+            
+            # Candidates: the nearest existing centroid and the centroids written so far
+            best_id, best_similarity = None, -1.0
+            if nearest["ids"] and len(nearest["ids"][i]) > 0:
+                nearest_id = nearest["ids"][i][0]
+                if nearest_id not in centroids:
+                    best_id, best_similarity = nearest_id, 1 - nearest["distances"][i][0]
+            for doc_id, centroid in centroids.items():
+                similarity = self._cosine_similarity(centroid["embedding"], embedding)
+                if similarity > best_similarity:
+                    best_id, best_similarity = doc_id, similarity
+            
+            # Merge into the nearest centroid if it is similar enough
+            if best_id is not None and best_similarity >= self.centroid_threshold:
+                centroid = centroids.get(best_id)
+                if centroid is None:
+                    centroid = centroids[best_id] = {
+                        "embedding": nearest["embeddings"][i][0],
+                        "count": nearest["metadatas"][i][0].get("count", 1)
+                    }
+                count = centroid["count"]
+                centroid["embedding"] = [
+                    float((c * count + e) / (count + 1))
+                    for c, e in zip(centroid["embedding"], embedding)
+                ]
+                centroid["count"] = metadata["count"] = count + 1
+                centroid["metadata"] = metadata
+                doc_ids.append(best_id)
+                continue
+            
+            # Otherwise add a new centroid to the collection
+            doc_id = f"query_{datetime.utcnow().timestamp()}_{i}"
+            centroids[doc_id] = {
+                "embedding": embedding,
+                "count": 1,
+                "metadata": metadata,
+                "document": query
+            }
+            doc_ids.append(doc_id)
+        
+        updated = [(doc_id, c) for doc_id, c in centroids.items() if "document" not in c]
+        added = [(doc_id, c) for doc_id, c in centroids.items() if "document" in c]
+        if updated:
+            self.collection.update(
+                ids=[doc_id for doc_id, _ in updated],
+                embeddings=[c["embedding"] for _, c in updated],
+                metadatas=[c["metadata"] for _, c in updated]
+            )
+        if added:
+            self.collection.add(
+                documents=[c["document"] for _, c in added],
+                embeddings=[c["embedding"] for _, c in added],
+                ids=[doc_id for doc_id, _ in added],
+                metadatas=[c["metadata"] for _, c in added]
+            )
+            
+            # Periodically re-cluster similarity regions
+            self._stores_since_refit += len(added)
+            if self._stores_since_refit >= self.refit_interval:
+                self.refit_regions()
+        
+        return doc_ids
+    
+    def _query_metadata(self,
+                        query: str,
+                        results: List[Dict],
+                        query_entities: Optional[Dict]) -> Dict:
+        """
+        Build the collection metadata of a stored query.
+        
+        Args:
+            query: Search query string
+            results: Search results
+            query_entities: Extracted entities from query
+            
+        Returns:
+            Metadata dictionary
+        """
+        now = time.time()
         metadata = {
             "query": query,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcfromtimestamp(now).isoformat(),
+            "ts": int(now),  # Unix time, for TTL checks without parsing the ISO timestamp
             "result_count": len(results),
-            "query_entities": json.dumps(query_entities) if query_entities else None
+            "query_entities": json.dumps(query_entities) if query_entities else None,
+            "count": 1
         }
         
-        # Store results as JSON in metadata (for small results)
+        # Store results in metadata (for small results)
         # For large results, we might want to store separately
         if len(results) <= 10:  # Store small result sets in metadata
-            metadata["results"] = json.dumps(results, default=str)
+            metadata["results"] = encode_results(results)
+        else:
+            metadata["results"] = ""
         
-        # Add document to collection
-        # Use query as both ID and document text for embedding
-        doc_id = f"query_{datetime.utcnow().timestamp()}"
+        return metadata
+    
+    @staticmethod
+    def _cosine_similarity(a: List[float], b: List[float]) -> float:
+        """
+        Cosine similarity of two embeddings (1 - Chroma's cosine distance).
         
-        self.collection.add(
-            documents=[query],
-            ids=[doc_id],
-            metadatas=[metadata]
-        )
+        Args:
+            a: First embedding
+            b: Second embedding
+            
+        Returns:
+            Similarity in [-1, 1]
+        """
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        norm = np.linalg.norm(a) * np.linalg.norm(b)
+        return float(a @ b / norm) if norm > 0 else 0.0
+    
+    def _compute_embedding(self, query: str) -> List[float]:
+        """
+        Compute the embedding for a query, reusing a persisted one if available.
         
-        return doc_id
+        Args:
+            query: Search query string
+            
+        Returns:
+            Embedding vector
+        """
+        return self._compute_embeddings([query])[0]
+    
+    def _compute_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """
+        Compute embeddings for queries in a single model call, reusing persisted ones.
+        
+        Args:
+            queries: Search query strings
+            
+        Returns:
+            Embedding vectors (in input order)
+        """
+        embeddings: List[Optional[List[float]]] = [None] * len(queries)
+        if self.query_store:
+            for i, query in enumerate(queries):
+                embeddings[i] = self.query_store.get_embedding(query)
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = self.embedding_function([queries[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = [float(x) for x in embedding]
+                if self.query_store:
+                    self.query_store.set_embedding(queries[i], embeddings[i])
+        
+        return embeddings
+    
+    def _embed_many(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed queries, using the in-process memo for a single query and one
+        batched model call for several.
+        
+        Args:
+            queries: Search query strings
+            
+        Returns:
+            Embedding vectors (in input order)
+        """
+        if len(queries) == 1:
+            return [self._embed(queries[0])]
+        return self._compute_embeddings(queries)
     
     def find_similar_query(self,
                           query: str,
@@ -93,24 +483,207 @@ class VectorCache:
         
         Args:
             query: Search query string
-            similarity_threshold: Minimum similarity score (0-1)
+            similarity_threshold: Minimum similarity score (0-1), used for regions
+                                  without a learned threshold
+            max_results: Maximum number of similar queries to return
+            
+        Returns:
+            Cached query metadata and results if found and not expired, None otherwise
+        """
+        return self.find_similar_queries([query], similarity_threshold, max_results)[0]
+    
+    def find_similar_queries(self,
+                             queries: List[str],
+                             similarity_threshold: float = 0.8,
+                             max_results: int = 1) -> List[Optional[Dict]]:
+        """
+        Find similar cached queries for several queries with one embedding call
+        and one collection query.
+        
+        Args:
+            queries: Search query strings
+            similarity_threshold: Minimum similarity score (0-1), used for regions
+                                  without a learned threshold
+            max_results: Maximum number of similar queries to return per query
+            
+        Returns:
+            For each query, cached query metadata and results if found and not expired, None otherwise
+        """
+        keys = [(query, round(similarity_threshold, 3), max_results) for query in queries]
+        cached_entries = [self._get_memoized_lookup(key) for key in keys]
+        
+        missing = [i for i, cached_entry in enumerate(cached_entries) if cached_entry is None]
+        if missing:
+            embeddings = self._embed_many([queries[i] for i in missing])
+            found = self._find_similar_batch(embeddings, similarity_threshold, max_results)
+            for i, cached_entry in zip(missing, found):
+                self._memoize_lookup(keys[i], cached_entry)
+                cached_entries[i] = cached_entry
+        
+        return cached_entries
+    
+    async def afind_similar_query(self,
+                                  query: str,
+                                  similarity_threshold: float = 0.8,
+                                  max_results: int = 1) -> Optional[Dict]:
+        """
+        Find a similar cached query, batching the embedding computation with
+        other concurrent lookups.
+        
+        Args:
+            query: Search query string
+            similarity_threshold: Minimum similarity score (0-1), used for regions
+                                  without a learned threshold
+            max_results: Maximum number of similar queries to return
+            
+        Returns:
+            Cached query metadata and results if found and not expired, None otherwise
+        """
+        key = (query, round(similarity_threshold, 3), max_results)
+        cached_entry = self._get_memoized_lookup(key)
+        if cached_entry is None:
+            embedding = await self._embedding_batcher.submit(query)
+            # The collection query and result decoding block, so run them off the event loop
+            cached_entry = await asyncio.to_thread(
+                self._find_similar, embedding, similarity_threshold, max_results
+            )
+            self._memoize_lookup(key, cached_entry)
+        return cached_entry
+    
+    def _get_memoized_lookup(self, key: tuple) -> Optional[Dict]:
+        """
+        Get a memoized lookup hit, unless its cache entry has expired since.
+        
+        Args:
+            key: Tuple of (query, similarity threshold, max results)
+            
+        Returns:
+            Copy of the cached entry, or None
+        """
+        cached_entry = self._lookup_cache.get(key)
+        if cached_entry is None:
+            return None
+        
+        if self._is_expired(cached_entry):
+            self._lookup_cache.pop(key)
+            return None
+        
+        return copy.deepcopy(cached_entry)
+    
+    def _memoize_lookup(self, key: tuple, cached_entry: Optional[Dict]):
+        """
+        Memoize a successful lookup.
+        
+        Args:
+            key: Tuple of (query, similarity threshold, max results)
+            cached_entry: Result of the lookup (misses are not memoized)
+        """
+        if cached_entry is not None:
+            self._lookup_cache.set(key, copy.deepcopy(cached_entry))
+    
+    def _is_expired(self, metadata: Dict) -> bool:
+        """
+        Check whether a cache entry is older than the TTL.
+        
+        Args:
+            metadata: Cache entry metadata (or a cached entry)
+            
+        Returns:
+            True if the entry has expired
+        """
+        return self._entry_time(metadata) < time.time() - self.ttl_seconds
+    
+    @staticmethod
+    def _entry_time(metadata: Dict) -> float:
+        """
+        Get the Unix time a cache entry was stored at.
+        
+        Args:
+            metadata: Cache entry metadata (or a cached entry)
+            
+        Returns:
+            Unix time, from "ts" or else the ISO "timestamp" (entries stored before
+            "ts" was added); infinity if the entry has no timestamp
+        """
+        ts = metadata.get("ts")
+        if ts is not None:
+            return float(ts)
+        timestamp_str = metadata.get("timestamp")
+        if not timestamp_str:
+            return float("inf")
+        return datetime.fromisoformat(timestamp_str).replace(tzinfo=timezone.utc).timestamp()
+    
+    def _find_similar(self,
+                      embedding: List[float],
+                      similarity_threshold: float,
+                      max_results: int) -> Optional[Dict]:
+        """
+        Find a cached query similar to an embedding.
+        
+        Args:
+            embedding: Query embedding
+            similarity_threshold: Default minimum similarity score (0-1)
             max_results: Maximum number of similar queries to return
             
         Returns:
             Cached query metadata and results if found and not expired, None otherwise
         """
+        return self._find_similar_batch([embedding], similarity_threshold, max_results)[0]
+    
+    def _find_similar_batch(self,
+                            embeddings: List[List[float]],
+                            similarity_threshold: float,
+                            max_results: int) -> List[Optional[Dict]]:
+        """
+        Find cached queries similar to several embeddings with one collection query.
+        
+        Args:
+            embeddings: Query embeddings
+            similarity_threshold: Default minimum similarity score (0-1)
+            max_results: Maximum number of similar queries to return per embedding
+            
+        Returns:
+            For each embedding, cached query metadata and results if found and not expired, None otherwise
+        """
         # Query collection for similar documents
         results = self.collection.query(
-            query_texts=[query],
+            query_embeddings=embeddings,
             n_results=max_results
         )
         
-        if not results["ids"] or len(results["ids"][0]) == 0:
-            return None
+        cached_entries = []
+        for i, embedding in enumerate(embeddings):
+            if not results["ids"] or len(results["ids"][i]) == 0:
+                cached_entries.append(None)
+                continue
+            
+            cached_entries.append(self._cached_entry(
+                embedding,
+                results["distances"][i],
+                results["metadatas"][i],
+                similarity_threshold
+            ))
         
-        # Get the most similar result
-        distances = results["distances"][0]
-        metadatas = results["metadatas"][0]
+        return cached_entries
+    
+    def _cached_entry(self,
+                      embedding: List[float],
+                      distances: List[float],
+                      metadatas: List[Dict],
+                      similarity_threshold: float) -> Optional[Dict]:
+        """
+        Turn the nearest collection matches of an embedding into a cache entry.
+        
+        Args:
+            embedding: Query embedding
+            distances: Distances of the matches (most similar first)
+            metadatas: Metadata of the matches
+            similarity_threshold: Default minimum similarity score (0-1)
+            
+        Returns:
+            Cached query metadata and results if similar enough and not expired, None otherwise
+        """
+        similarity_threshold = self.region_thresholds.threshold_for(embedding, similarity_threshold)
         
         # Check similarity threshold (ChromaDB uses distance, lower is more similar)
         # Cosine distance: 0 = identical, 1 = opposite
@@ -121,11 +694,8 @@ class VectorCache:
         metadata = metadatas[0]
         
         # Check TTL
-        timestamp_str = metadata.get("timestamp")
-        if timestamp_str:
-            timestamp = datetime.fromisoformat(timestamp_str)
-            if datetime.utcnow() - timestamp > timedelta(seconds=self.ttl_seconds):
-                return None  # Expired
+        if self._is_expired(metadata):
+            return None  # Expired
         
         # Reconstruct cached entry
         cached_entry = {
@@ -138,7 +708,7 @@ class VectorCache:
         # Try to get results from metadata
         if metadata.get("results"):
             try:
-                cached_entry["results"] = json.loads(metadata["results"])
+                cached_entry["results"] = decode_results(metadata["results"])
             except:
                 cached_entry["results"] = None
         else:
@@ -146,34 +716,63 @@ class VectorCache:
         
         return cached_entry
     
+    def record_feedback(self, query: str, similarity: float, correct: bool):
+        """
+        Record whether a cache hit was verified as correct, tuning the threshold
+        of the query's similarity region.
+        
+        Args:
+            query: Query that was served from cache
+            similarity: Similarity of the cached query that was served
+            correct: Whether the cached results were correct for the query
+        """
+        self.region_thresholds.record(self._embed(query), similarity, correct)
+        if not correct:
+            # Do not keep serving a memoized hit that was found to be wrong
+            self._lookup_cache.clear()
+    
+    def refit_regions(self):
+        """Re-cluster cached query embeddings into similarity regions."""
+        self._stores_since_refit = 0
+        all_results = self.collection.get(include=["embeddings"])
+        embeddings = all_results.get("embeddings")
+        if embeddings is not None and len(embeddings) > 0:
+            self.region_thresholds.fit(embeddings)
+    
     def clear_expired(self):
         """Remove expired entries from cache."""
         # Get all entries
-        all_results = self.collection.get()
+        all_results = self.collection.get(include=["metadatas"])
         
         if not all_results["ids"]:
             return
         
-        expired_ids = []
-        now = datetime.utcnow()
-        
-        for i, metadata in enumerate(all_results["metadatas"]):
-            timestamp_str = metadata.get("timestamp")
-            if timestamp_str:
-                timestamp = datetime.fromisoformat(timestamp_str)
-                if now - timestamp > timedelta(seconds=self.ttl_seconds):
-                    expired_ids.append(all_results["ids"][i])
+        # Compare all entry times against the cutoff at once
+        metadatas = all_results["metadatas"]
+        timestamps = np.fromiter(
+            (self._entry_time(metadata) for metadata in metadatas),
+            dtype=np.float64,
+            count=len(metadatas)
+        )
+        expired = np.flatnonzero(timestamps < time.time() - self.ttl_seconds)
+        expired_ids = [all_results["ids"][i] for i in expired]
         
         # Delete expired entries
         if expired_ids:
             self.collection.delete(ids=expired_ids)
+            self._lookup_cache.clear()
     
     def clear_all(self):
         """Clear all cached entries."""
         # Delete and recreate collection
+        self._lookup_cache.clear()
         self.client.delete_collection(name=self.collection_name)
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata=self.COLLECTION_METADATA
         )
 
+    
+    async def aclose(self):
+        """Stop the embedding batcher."""
+        await self._embedding_batcher.aclose()
@@ -0,0 +1,130 @@
+"""
+Persistent SQLite store for memoizing per-query work (LLM improvements, embeddings)
+across restarts
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import orjson
+    
+    def json_dumps(value) -> str:
+        return orjson.dumps(value).decode("utf-8")
+    
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+
+class QueryStore:
+    """
+    SQLite-backed memoization layer keyed by query hash.
+    Stores LLM query improvements as JSON and query embeddings as float32 blobs.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize query store.
+        
+        Args:
+            db_path: Path to SQLite database file (defaults to env var or ./query_cache.db)
+        """
+        self.db_path = db_path or os.getenv("QUERY_CACHE_DB_PATH", "./query_cache.db")
+        
+        # Connection is shared across threads; access is serialized by the lock
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS improvements ("
+            "query_hash TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "query_hash TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self.connection.commit()
+    
+    @staticmethod
+    def hash_query(query: str) -> str:
+        """Get the storage key for a query."""
+        return hashlib.blake2b(query.encode("utf-8")).hexdigest()
+    
+    def get_improvement(self, query: str) -> Optional[Dict]:
+        """
+        Get a stored LLM improvement for a query.
+        
+        Args:
+            query: Original search query
+            
+        Returns:
+            Improvement dictionary if stored, None otherwise
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT payload FROM improvements WHERE query_hash = ?",
+                (self.hash_query(query),)
+            ).fetchone()
+        return json_loads(row[0]) if row else None
+    
+    def set_improvement(self, query: str, improvement: Dict):
+        """
+        Store an LLM improvement for a query.
+        
+        Args:
+            query: Original search query
+            improvement: Improvement dictionary
+        """
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO improvements (query_hash, payload) VALUES (?, ?)",
+                (self.hash_query(query), json_dumps(improvement))
+            )
+            self.connection.commit()
+    
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        """
+        Get a stored embedding for a query.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Embedding vector if stored, None otherwise
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT embedding FROM embeddings WHERE query_hash = ?",
+                (self.hash_query(query),)
+            ).fetchone()
+        return np.frombuffer(row[0], dtype=np.float32).tolist() if row else None
+    
+    def set_embedding(self, query: str, embedding: List[float]):
+        """
+        Store an embedding for a query.
+        
+        Args:
+            query: Search query
+            embedding: Embedding vector
+        """
+        blob = np.asarray(embedding, dtype=np.float32).tobytes()
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO embeddings (query_hash, embedding) VALUES (?, ?)",
+                (self.hash_query(query), blob)
+            )
+            self.connection.commit()
+    
+    def close(self):
+        """Close database connection."""
+        with self._lock:
+            self.connection.close()
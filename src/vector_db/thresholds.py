@@ -0,0 +1,154 @@
+"""
+Adaptive per-region similarity thresholds for the query cache
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+
+class RegionThresholds:
+    """
+    Learns a cache-hit similarity threshold per semantic region.
+    Cached query embeddings are clustered with mini-batch k-means; each cluster
+    keeps its own threshold, chosen from verified hit feedback to minimize the
+    wrong-hit rate while keeping a minimum recall of correct hits.
+    """
+    
+    def __init__(self,
+                 recall_floor: float = 0.9,
+                 min_observations: int = 5,
+                 min_threshold: float = 0.5,
+                 max_observations: int = 5000):
+        """
+        Initialize region thresholds.
+        
+        Args:
+            recall_floor: Minimum fraction of verified-correct hits a threshold must keep
+            min_observations: Feedback observations needed before a region overrides the default
+            min_threshold: Lowest threshold a region may learn
+            max_observations: Maximum number of feedback observations kept in memory
+        """
+        self.recall_floor = recall_floor
+        self.min_observations = min_observations
+        self.min_threshold = min_threshold
+        
+        self.centroids: Optional[np.ndarray] = None
+        self.thresholds: Dict[int, float] = {}
+        
+        # Feedback observations: (normalized embedding, similarity, correct)
+        self._observations = deque(maxlen=max_observations)
+        self._lock = threading.Lock()
+    
+    def fit(self, embeddings: Sequence[Sequence[float]]):
+        """
+        Cluster cached embeddings into regions (k = sqrt(N)) and recompute thresholds.
+        
+        Args:
+            embeddings: Embeddings of cached queries
+        """
+        if len(embeddings) < 2:
+            return
+        
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        n_clusters = max(1, int(round(math.sqrt(len(vectors)))))
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, n_init=3, random_state=0)
+        kmeans.fit(vectors)
+        
+        with self._lock:
+            self.centroids = self._normalize(kmeans.cluster_centers_.astype(np.float32))
+            self._recompute_thresholds()
+    
+    def threshold_for(self, embedding: Sequence[float], default: float) -> float:
+        """
+        Get the similarity threshold for the region of an embedding.
+        
+        Args:
+            embedding: Query embedding
+            default: Threshold used when the region has too little feedback
+            
+        Returns:
+            Similarity threshold (0-1)
+        """
+        with self._lock:
+            region = self._region_of(self._normalize(np.asarray(embedding, dtype=np.float32)))
+            return self.thresholds.get(region, default)
+    
+    def record(self, embedding: Sequence[float], similarity: float, correct: bool):
+        """
+        Record verified feedback for a cache hit and update its region's threshold.
+        
+        Args:
+            embedding: Embedding of the query that was served from cache
+            similarity: Similarity between the query and the cached query
+            correct: Whether the cached results were verified as correct for the query
+        """
+        vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            self._observations.append((vector, similarity, correct))
+            region = self._region_of(vector)
+            self._update_threshold(region, [
+                (sim, ok) for vec, sim, ok in self._observations
+                if self._region_of(vec) == region
+            ])
+    
+    def _region_of(self, vector: np.ndarray) -> Optional[int]:
+        """Get the index of the nearest centroid (None before the first fit)."""
+        if self.centroids is None:
+            return None
+        return int(np.argmax(self.centroids @ vector))
+    
+    def _recompute_thresholds(self):
+        """Reassign all observations to the current regions and recompute thresholds."""
+        by_region: Dict[Optional[int], List] = {}
+        for vector, similarity, correct in self._observations:
+            by_region.setdefault(self._region_of(vector), []).append((similarity, correct))
+        
+        self.thresholds = {}
+        for region, observations in by_region.items():
+            self._update_threshold(region, observations)
+    
+    def _update_threshold(self, region: Optional[int], observations: List):
+        """
+        Choose the threshold minimizing the wrong-hit rate subject to the recall floor.
+        
+        Args:
+            region: Region index
+            observations: List of (similarity, correct) feedback in the region
+        """
+        if len(observations) < self.min_observations:
+            self.thresholds.pop(region, None)
+            return
+        
+        total_correct = sum(1 for _, correct in observations if correct)
+        if total_correct == 0:
+            # Every verified hit was wrong: only accept closer matches than any seen
+            max_similarity = max(similarity for similarity, _ in observations)
+            self.thresholds[region] = min(1.0, max_similarity + 0.01)
+            return
+        
+        best_threshold = None
+        best_wrong_rate = None
+        for threshold in sorted({similarity for similarity, _ in observations}):
+            hits = [correct for similarity, correct in observations if similarity >= threshold]
+            correct_hits = sum(hits)
+            if correct_hits / total_correct < self.recall_floor:
+                break
+            
+            wrong_rate = (len(hits) - correct_hits) / len(hits)
+            if best_wrong_rate is None or wrong_rate < best_wrong_rate:
+                best_threshold = threshold
+                best_wrong_rate = wrong_rate
+        
+        if best_threshold is not None:
+            self.thresholds[region] = max(self.min_threshold, best_threshold)
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize vectors so dot products are cosine similarities."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
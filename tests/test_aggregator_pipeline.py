@@ -0,0 +1,113 @@
+"""
+Tests for the directory aggregation pipeline (no OCR engine or database needed)
+"""
+
+import pytest
+
+from src.pipeline.aggregator import NewsAggregator
+
+
+TEXT = "Ada Lovelace met Charles Babbage in London on Monday to discuss the Analytical Engine."
+
+
+class FakeOCRExtractor:
+    """Returns the same text for every file, recording the page worker counts."""
+    
+    def __init__(self):
+        self.max_workers = []
+    
+    def extract_from_file(self, file_path: str, max_workers=None) -> str:
+        self.max_workers.append(max_workers)
+        return TEXT
+
+
+class FakeDatabase:
+    """Records indexed documents."""
+    
+    def __init__(self):
+        self.indexed = []
+    
+    def index_documents(self, docs: list) -> list:
+        self.indexed.extend(docs)
+        return ["updated"] * len(docs)
+
+
+class BatchNERExtractor:
+    """Records the size of every NER batch."""
+    
+    def __init__(self):
+        self.batch_sizes = []
+    
+    def extract_entities_batch(self, texts: list) -> list:
+        self.batch_sizes.append(len(texts))
+        return [{"people": ["Ada Lovelace"]} for _ in texts]
+
+
+class SingleNERExtractor:
+    """An extractor without batch support."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def extract_entities(self, text: str) -> dict:
+        self.calls += 1
+        if self.calls == 2:
+            raise RuntimeError("boom")
+        return {"people": ["Ada Lovelace"]}
+
+
+@pytest.fixture
+def files(tmp_path):
+    for i in range(20):
+        (tmp_path / f"{i:02d}.pdf").write_bytes(b"")
+    return tmp_path
+
+
+def make_aggregator(ner_extractor) -> NewsAggregator:
+    return NewsAggregator(
+        database=FakeDatabase(),
+        ocr_extractor=FakeOCRExtractor(),
+        ner_extractor=ner_extractor
+    )
+
+
+def test_ner_batches_are_not_capped_by_the_queue_size(files, monkeypatch):
+    # Give the OCR stage time to queue everything before the first batch runs
+    monkeypatch.setattr(NewsAggregator, "NER_BATCH_TIMEOUT_SECONDS", 5)
+    ner_extractor = BatchNERExtractor()
+    
+    results = make_aggregator(ner_extractor).aggregate_from_directory(str(files))
+    
+    assert len(results) == 20
+    assert sum(ner_extractor.batch_sizes) == 20
+    assert max(ner_extractor.batch_sizes) > NewsAggregator.PIPELINE_QUEUE_SIZE
+
+
+def test_ner_batches_are_capped_by_the_batch_size(files, monkeypatch):
+    monkeypatch.setattr(NewsAggregator, "NER_BATCH_SIZE", 6)
+    ner_extractor = BatchNERExtractor()
+    
+    make_aggregator(ner_extractor).aggregate_from_directory(str(files))
+    
+    assert sum(ner_extractor.batch_sizes) == 20
+    assert max(ner_extractor.batch_sizes) <= 6
+
+
+def test_extractor_without_batch_support_extracts_one_text_at_a_time(files):
+    ner_extractor = SingleNERExtractor()
+    aggregator = make_aggregator(ner_extractor)
+    
+    results = aggregator.aggregate_from_directory(str(files))
+    
+    # Only the text that failed is lost
+    assert ner_extractor.calls == 20
+    assert len(results) == 19
+    assert len(aggregator.database.indexed) == 19
+
+
+def test_files_processed_in_parallel_ocr_pages_one_at_a_time(files):
+    aggregator = make_aggregator(BatchNERExtractor())
+    
+    aggregator.aggregate_from_directory(str(files))
+    
+    assert aggregator.ocr_extractor.max_workers == [1] * 20
@@ -0,0 +1,102 @@
+"""
+Tests for serving searches from the vector cache
+"""
+
+import asyncio
+import threading
+
+from src.api import app as app_module
+from src.api.app import SearchRequest, _lookup_cached_search
+
+
+CACHED_RESULT = {
+    "query": "ada lovelace in london",
+    "similarity": 0.9,
+    "results": [{"url": "file:///news/1.pdf", "entities": {}, "relevance_score": 0.8}],
+    "query_entities": {"people": ["Ada Lovelace"]}
+}
+
+
+class FakeVectorCache:
+    """Returns a fixed cache hit and records feedback."""
+    
+    def __init__(self, cached_result):
+        self.cached_result = cached_result
+        self.feedback = []
+    
+    async def afind_similar_query(self, query, similarity_threshold=0.8):
+        return self.cached_result
+    
+    def record_feedback(self, query, similarity, correct):
+        self.feedback.append((query, similarity, correct))
+
+
+class SlowLLMImprover:
+    """Blocks until released, as a slow LLM call would."""
+    
+    def __init__(self, entities):
+        self.entities = entities
+        self.release = threading.Event()
+        self.calls = 0
+    
+    def improve_query(self, query, reuse_similar=True):
+        self.calls += 1
+        self.release.wait(5)
+        return {"entities": self.entities}
+
+
+def lookup(request, vector_cache, llm_improver):
+    """Look up a cached search, then let background verification finish."""
+    async def run():
+        response = await _lookup_cached_search(request, vector_cache, llm_improver)
+        # The response is ready before the LLM answers
+        assert vector_cache.feedback == []
+        llm_improver.release.set()
+        await asyncio.gather(*app_module._verification_tasks)
+        return response
+    
+    return asyncio.run(run())
+
+
+def test_cache_hit_is_served_before_verification(monkeypatch):
+    monkeypatch.setattr(app_module, "CACHE_HIT_VERIFY_RATE", 1.0)
+    vector_cache = FakeVectorCache(CACHED_RESULT)
+    llm_improver = SlowLLMImprover({"people": ["Charles Babbage"]})
+    
+    response = lookup(SearchRequest(query="ada in london", use_llm_improvement=True), vector_cache, llm_improver)
+    
+    # A mismatching verification is recorded, but the hit was already served
+    assert response.cached
+    assert response.results == CACHED_RESULT["results"]
+    assert llm_improver.calls == 1
+    assert vector_cache.feedback == [("ada in london", 0.9, False)]
+
+
+def test_matching_verification_is_recorded_as_correct(monkeypatch):
+    monkeypatch.setattr(app_module, "CACHE_HIT_VERIFY_RATE", 1.0)
+    vector_cache = FakeVectorCache(CACHED_RESULT)
+    llm_improver = SlowLLMImprover({"people": ["ada lovelace"]})
+    
+    lookup(SearchRequest(query="ada in london", use_llm_improvement=True), vector_cache, llm_improver)
+    
+    assert vector_cache.feedback == [("ada in london", 0.9, True)]
+
+
+def test_unsampled_cache_hits_are_not_verified(monkeypatch):
+    monkeypatch.setattr(app_module, "CACHE_HIT_VERIFY_RATE", 0.0)
+    vector_cache = FakeVectorCache(CACHED_RESULT)
+    llm_improver = SlowLLMImprover({})
+    
+    response = lookup(SearchRequest(query="ada in london", use_llm_improvement=True), vector_cache, llm_improver)
+    
+    assert response.cached
+    assert llm_improver.calls == 0
+    assert vector_cache.feedback == []
+
+
+def test_cache_miss(monkeypatch):
+    monkeypatch.setattr(app_module, "CACHE_HIT_VERIFY_RATE", 1.0)
+    llm_improver = SlowLLMImprover({})
+    
+    assert lookup(SearchRequest(query="anything"), FakeVectorCache(None), llm_improver) is None
+    assert llm_improver.calls == 0
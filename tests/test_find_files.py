@@ -0,0 +1,46 @@
+"""
+Tests for recursive file discovery
+"""
+
+import os
+
+from src.ocr.extractor import find_files
+
+
+def touch(path) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    return str(path)
+
+
+def test_finds_matching_files_recursively_in_sorted_order(tmp_path):
+    expected = [
+        touch(tmp_path / "b.pdf"),
+        touch(tmp_path / "a" / "scan.png"),
+        touch(tmp_path / "a" / "deeper" / "page.JPG"),
+    ]
+    touch(tmp_path / "notes.txt")
+    touch(tmp_path / "a" / "archive.pdf.bak")
+    
+    assert find_files(str(tmp_path), [".pdf", ".png", ".jpg"]) == sorted(expected)
+
+
+def test_extensions_are_case_insensitive(tmp_path):
+    upper = touch(tmp_path / "UPPER.PDF")
+    lower = touch(tmp_path / "lower.pdf")
+    
+    assert find_files(str(tmp_path), [".PDF"]) == sorted([upper, lower])
+
+
+def test_empty_directory(tmp_path):
+    assert find_files(str(tmp_path), [".pdf"]) == []
+
+
+def test_does_not_follow_directory_symlinks(tmp_path):
+    outside = tmp_path / "outside"
+    touch(outside / "linked.pdf")
+    root = tmp_path / "root"
+    inside = touch(root / "inside.pdf")
+    os.symlink(outside, root / "link", target_is_directory=True)
+    
+    assert find_files(str(root), [".pdf"]) == [inside]
@@ -0,0 +1,154 @@
+"""
+Tests for the background job queue
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.pipeline.jobs import JobQueue
+
+
+@pytest.fixture
+def job_queue():
+    queue = JobQueue(max_workers=1, max_jobs=3)
+    yield queue
+    queue.shutdown(wait=True)
+
+
+def wait_for(job_queue: JobQueue, job_id: str) -> dict:
+    """Wait until a job has run by queueing a no-op behind it on the single worker."""
+    job_queue.executor.submit(lambda: None).result(timeout=5)
+    return job_queue.get(job_id)
+
+
+def test_finished_job_records_result(job_queue):
+    job_id = job_queue.submit(lambda a, b=0: a + b, 2, b=3)
+    
+    job = wait_for(job_queue, job_id)
+    
+    assert job["status"] == "finished"
+    assert job["result"] == 5
+    assert job["error"] is None
+
+
+def test_failed_job_records_error(job_queue):
+    def fail():
+        raise RuntimeError("boom")
+    
+    job_id = job_queue.submit(fail)
+    
+    job = wait_for(job_queue, job_id)
+    
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+
+
+def test_unknown_job_is_none(job_queue):
+    assert job_queue.get("missing") is None
+
+
+def test_get_returns_a_copy(job_queue):
+    job_id = job_queue.submit(lambda: 1)
+    wait_for(job_queue, job_id)
+    
+    job_queue.get(job_id)["status"] = "tampered"
+    
+    assert job_queue.get(job_id)["status"] == "finished"
+
+
+def test_oldest_finished_jobs_are_evicted(job_queue):
+    job_ids = [job_queue.submit(lambda i=i: i) for i in range(3)]
+    wait_for(job_queue, job_ids[-1])
+    
+    newest = job_queue.submit(lambda: "new")
+    wait_for(job_queue, newest)
+    
+    assert job_queue.get(job_ids[0]) is None
+    assert [job_queue.get(job_id)["result"] for job_id in job_ids[1:]] == [1, 2]
+    assert job_queue.get(newest)["result"] == "new"
+
+
+def test_unfinished_jobs_are_never_evicted(job_queue):
+    release = threading.Event()
+    blocked = [job_queue.submit(release.wait, 5) for _ in range(4)]
+    
+    # Over max_jobs, but nothing has finished yet
+    assert all(job_queue.get(job_id) is not None for job_id in blocked)
+    
+    release.set()
+    wait_for(job_queue, blocked[-1])
+    assert all(job_queue.get(job_id)["status"] == "finished" for job_id in blocked)
+
+
+class FakeJobCollection:
+    """Just enough of a pymongo collection for persisted jobs."""
+    
+    def __init__(self):
+        self.docs = {}
+        self.indexes = []
+    
+    def create_index(self, keys, **kwargs):
+        self.indexes.append((keys, kwargs))
+    
+    def insert_one(self, doc: dict):
+        self.docs[doc["job_id"]] = dict(doc)
+    
+    def find_one(self, query: dict):
+        doc = self.docs.get(query["job_id"])
+        return dict(doc) if doc else None
+    
+    def update_one(self, query: dict, update: dict):
+        self.docs[query["job_id"]].update(update["$set"])
+    
+    def update_many(self, query: dict, update: dict):
+        for job_id in query["job_id"]["$in"]:
+            self.docs[job_id].update(update["$set"])
+
+
+@pytest.fixture
+def persisted_queue():
+    collection = FakeJobCollection()
+    queue = JobQueue(max_workers=1, collection=collection)
+    yield queue, collection
+    queue.shutdown(wait=True)
+
+
+def test_persisted_job_is_visible_to_other_queues(persisted_queue):
+    queue, collection = persisted_queue
+    job_id = queue.submit(lambda: {"url": "a.pdf"})
+    wait_for(queue, job_id)
+    
+    # e.g. another API worker process sharing the collection
+    other = JobQueue(max_workers=1, collection=collection)
+    job = other.get(job_id)
+    other.shutdown(wait=True)
+    
+    assert job["status"] == "finished"
+    assert job["result"] == {"url": "a.pdf"}
+    assert set(job) == {"job_id", "status", "result", "error", "created_at"}
+
+
+def test_persisted_job_without_heartbeat_is_reported_failed(persisted_queue):
+    queue, collection = persisted_queue
+    collection.insert_one({
+        "job_id": "orphan",
+        "status": "running",
+        "result": None,
+        "error": None,
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": datetime(2024, 1, 1),
+        "heartbeat_at": datetime(2024, 1, 1)
+    })
+    
+    job = queue.get("orphan")
+    
+    assert job["status"] == "failed"
+    assert "interrupted" in job["error"]
+
+
+def test_persisted_jobs_expire(persisted_queue):
+    _, collection = persisted_queue
+    
+    assert ("updated_at", {"expireAfterSeconds": JobQueue.JOB_TTL_SECONDS}) in collection.indexes
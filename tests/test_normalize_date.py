@@ -0,0 +1,68 @@
+"""
+Tests for date normalization against the original strptime loop
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.ner.extractor import normalize_date
+
+
+def strptime_normalize_date(date_text: str) -> str:
+    """The original implementation: try every format in turn."""
+    date_formats = [
+        '%Y-%m-%d',
+        '%B %d, %Y',
+        '%b %d, %Y',
+        '%d %B %Y',
+        '%d %b %Y',
+        '%Y',
+        '%B %Y',
+        '%b %Y',
+    ]
+    
+    for fmt in date_formats:
+        try:
+            dt = datetime.strptime(date_text, fmt)
+            if '%Y' in fmt and len(fmt.replace('%Y', '').replace('%', '').replace(' ', '').replace(',', '').replace('-', '')) == 0:
+                return str(dt.year)
+            elif '%Y' in fmt and '%d' not in fmt:
+                return dt.strftime('%B %Y')
+            else:
+                return dt.strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    
+    return date_text
+
+
+DATE_TEXTS = [
+    # ISO dates
+    "2024-03-05", "2024-3-5", "1999-12-31", "2024-02-30", "2024-13-01", "24-03-05",
+    # Month day, year
+    "March 5, 2024", "Mar 5, 2024", "march 05, 2024", "MARCH 5, 2024", "Sept 5, 2024",
+    "February 30, 2024", "March 5,2024", "March  5,  2024",
+    # Day month year
+    "5 March 2024", "05 Mar 2024", "31 June 2024", "5 march 2024",
+    # Year only
+    "2024", "0999", "999", "20245",
+    # Month year
+    "March 2024", "Mar 2024", "May 2024", "june 2024", "Sept 2024", "Foo 2024",
+    # Not dates
+    "today", "yesterday", "last week", "", " ", "2024 ", " 2024", "2024\n",
+    "March", "5 March", "March 5", "the 1990s",
+]
+
+
+@pytest.mark.parametrize("date_text", DATE_TEXTS)
+def test_normalize_date_matches_strptime_loop(date_text):
+    assert normalize_date(date_text) == strptime_normalize_date(date_text)
+
+
+def test_normalize_date_output_formats():
+    assert normalize_date("March 5, 2024") == "2024-03-05"
+    assert normalize_date("5 Mar 2024") == "2024-03-05"
+    assert normalize_date("2024") == "2024"
+    assert normalize_date("Mar 2024") == "March 2024"
+    assert normalize_date("next Tuesday") == "next Tuesday"
@@ -0,0 +1,60 @@
+"""
+Tests for MongoDB query building (no database connection needed)
+"""
+
+import pytest
+
+from src.database.nosql_db import NoSQLDatabase
+
+
+@pytest.fixture
+def database():
+    # Query building does not touch the connection
+    return NoSQLDatabase.__new__(NoSQLDatabase)
+
+
+def category_branches(query: dict) -> list:
+    """Get the per-category branches of a built query."""
+    if "$and" in query:
+        # Uniform thresholds: [cross-category candidate filter, per-category query]
+        query = query["$and"][1]
+    return query["$or"]
+
+
+def branch_fields(branch: dict) -> set:
+    """Get all field paths referenced by a category branch."""
+    fields = set()
+    for condition in branch["$and"]:
+        for term_condition in condition.get("$or", [condition]):
+            fields.update(term_condition)
+    return fields
+
+
+def test_uniform_thresholds_keep_terms_in_their_category(database):
+    query_params = {"people": ["jordan"], "locations": ["paris"]}
+    
+    query = database._build_query(query_params, {"people": 0.5, "locations": 0.5}, scoring=False)
+    
+    # Cross-category candidate filter plus the per-category restriction
+    assert len(query["$and"]) == 2
+    branches = category_branches(query)
+    assert {"entities.people.key_lc": {"$in": ["jordan"]}} in branches[0]["$and"][0]["$or"]
+    assert {"entities.locations.key_lc": {"$in": ["paris"]}} in branches[1]["$and"][0]["$or"]
+    assert all(
+        not field.startswith("entities.locations") for field in branch_fields(branches[0])
+    )
+    assert {"entities.people.value": {"$gte": 0.5}} in branches[0]["$and"]
+
+
+def test_uniform_and_mixed_thresholds_share_the_category_query(database):
+    query_params = {"people": ["jordan"], "countries": ["france"]}
+    
+    uniform = database._build_query(query_params, {"people": 0.4, "countries": 0.4})
+    mixed = database._build_query(query_params, {"people": 0.4, "countries": 0.6})
+    
+    assert category_branches(uniform)[0] == category_branches(mixed)[0]
+    assert "$and" not in mixed
+
+
+def test_empty_query_params_build_empty_query(database):
+    assert database._build_query({"people": []}, {}) == {}
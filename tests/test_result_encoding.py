@@ -0,0 +1,86 @@
+"""
+Tests for the serialization of cached search results
+"""
+
+import json
+
+import pytest
+
+from src.vector_db import cache as cache_module
+from src.vector_db.cache import (
+    COMPRESS_MIN_BYTES,
+    MSGPACK_PREFIX,
+    MSGPACK_ZSTD_PREFIX,
+    decode_results,
+    encode_results,
+)
+
+
+SMALL_RESULTS = [
+    {
+        "url": "file:///news/1.pdf",
+        "relevance_score": 0.75,
+        "entities": {"people": [{"key": "Ada Lovelace", "value": 0.9}]}
+    }
+]
+
+
+def large_results() -> list:
+    return [
+        {"url": f"file:///news/{i}.pdf", "relevance_score": i / 100, "entities": {"events": []}}
+        for i in range(100)
+    ]
+
+
+def test_small_results_round_trip_uncompressed():
+    pytest.importorskip("msgpack")
+    encoded = encode_results(SMALL_RESULTS)
+    
+    assert encoded.startswith(MSGPACK_PREFIX)
+    assert decode_results(encoded) == SMALL_RESULTS
+
+
+def test_large_results_round_trip_compressed():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+    results = large_results()
+    assert len(json.dumps(results)) >= COMPRESS_MIN_BYTES
+    
+    encoded = encode_results(results)
+    
+    assert encoded.startswith(MSGPACK_ZSTD_PREFIX)
+    assert decode_results(encoded) == results
+
+
+def test_large_results_without_zstandard_are_not_compressed(monkeypatch):
+    pytest.importorskip("msgpack")
+    monkeypatch.setattr(cache_module, "zstandard", None)
+    results = large_results()
+    
+    encoded = encode_results(results)
+    
+    assert encoded.startswith(MSGPACK_PREFIX)
+    assert decode_results(encoded) == results
+
+
+def test_json_is_used_without_msgpack(monkeypatch):
+    monkeypatch.setattr(cache_module, "msgpack", None)
+    
+    encoded = encode_results(SMALL_RESULTS)
+    
+    assert json.loads(encoded) == SMALL_RESULTS
+    assert decode_results(encoded) == SMALL_RESULTS
+
+
+def test_legacy_json_values_are_decoded():
+    assert decode_results(json.dumps(SMALL_RESULTS)) == SMALL_RESULTS
+    assert decode_results("[]") == []
+
+
+def test_non_serializable_values_are_stringified():
+    pytest.importorskip("msgpack")
+    results = [{"url": "a", "indexed_at": object()}]
+    
+    decoded = decode_results(encode_results(results))
+    
+    assert isinstance(decoded[0]["indexed_at"], str)
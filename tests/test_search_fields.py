@@ -0,0 +1,81 @@
+"""
+Tests for the search fields added at ingest and backfilled on older documents
+"""
+
+import pytest
+
+from src.database.nosql_db import NoSQLDatabase
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection for the search field backfill."""
+    
+    def __init__(self, docs: list):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.bulk_writes = []
+    
+    def find(self, query: dict, projection: dict, batch_size: int = 0):
+        missing = [next(iter(condition)) for condition in query["$or"]]
+        return [
+            {"_id": doc["_id"], "entities": doc.get("entities", {})}
+            for doc in self.docs.values()
+            if any(field not in doc for field in missing)
+        ]
+    
+    def bulk_write(self, ops: list, ordered: bool = True):
+        self.bulk_writes.append(len(ops))
+        for op in ops:
+            self.docs[op._filter["_id"]].update(op._doc["$set"])
+        return type("BulkWriteResult", (), {"modified_count": len(ops)})()
+
+
+def legacy_doc(i: int) -> dict:
+    return {
+        "_id": i,
+        "url": f"file:///news/{i}.pdf",
+        "entities": {"people": [{"key": "Ada Lovelace", "value": 0.9}], "places": []},
+        "indexed_at": "2024-01-01"
+    }
+
+
+@pytest.fixture
+def database():
+    return NoSQLDatabase.__new__(NoSQLDatabase)
+
+
+def test_prepared_document_has_search_fields(database):
+    doc = database._prepare_document({"url": "u", "entities": {"people": [{"key": "Ada Lovelace", "value": 0.9}]}})
+    
+    assert doc["entities"]["people"][0] == {
+        "key": "Ada Lovelace", "value": 0.9, "key_lc": "ada lovelace", "tokens": ["ada", "lovelace"]
+    }
+    assert doc["search_blob"] == "ada lovelace"
+    assert doc["all_entity_keys_lc"] == ["ada lovelace"]
+    assert doc["all_entity_tokens"] == ["ada", "lovelace"]
+    assert doc["all_entity_values"] == [0.9]
+    assert "indexed_at" in doc
+
+
+def test_backfill_adds_search_fields_to_legacy_documents(database):
+    current = database._prepare_document(legacy_doc(0))
+    database.collection = FakeCollection([current] + [legacy_doc(i) for i in range(1, 4)])
+    
+    assert database._backfill_search_fields() == 3
+    
+    for i in range(1, 4):
+        doc = database.collection.docs[i]
+        expected = {key: value for key, value in current.items() if key not in ("_id", "url", "indexed_at")}
+        assert {key: doc[key] for key in expected} == expected
+        # The original indexing time is kept
+        assert doc["indexed_at"] == "2024-01-01"
+    
+    # Nothing left to backfill
+    assert database._backfill_search_fields() == 0
+
+
+def test_backfill_writes_in_batches(database, monkeypatch):
+    monkeypatch.setattr(NoSQLDatabase, "BULK_WRITE_BATCH_SIZE", 2)
+    database.collection = FakeCollection([legacy_doc(i) for i in range(5)])
+    
+    assert database._backfill_search_fields() == 5
+    assert database.collection.bulk_writes == [2, 2, 1]
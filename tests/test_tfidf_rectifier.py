@@ -0,0 +1,225 @@
+"""
+Tests for TF-IDF entity scoring against the original per-category implementation
+"""
+
+import random
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from src.rectifier import HashingTfidfVectorizer, TFIDFRectifier
+
+
+def original_category_scores(entities: list, source_text: str) -> dict:
+    """The original implementation: fit TF-IDF on the entity contexts of one category."""
+    source_lower = source_text.lower()
+    documents = []
+    for entity in entities:
+        contexts = []
+        start = 0
+        while True:
+            idx = source_lower.find(entity.lower(), start)
+            if idx == -1:
+                break
+            contexts.append(source_text[max(0, idx - 50):min(len(source_text), idx + len(entity) + 50)])
+            start = idx + 1
+        documents.append(" ".join(contexts) if contexts else entity)
+    
+    try:
+        vectorizer = TfidfVectorizer(lowercase=True, analyzer='word', ngram_range=(1, 2), min_df=1, max_df=0.95)
+        tfidf_matrix = vectorizer.fit_transform(documents)
+    except ValueError:
+        # Frequency-based fallback
+        frequencies = {entity: source_lower.count(entity.lower()) for entity in entities}
+        max_freq = max(frequencies.values())
+        return {
+            entity: round(freq / max_freq, 2) if max_freq > 0 else 0.5
+            for entity, freq in frequencies.items()
+        }
+    
+    feature_names = vectorizer.get_feature_names_out()
+    scores = {}
+    for i, entity in enumerate(entities):
+        row = tfidf_matrix[i].toarray()[0]
+        entity_words = set(entity.lower().split())
+        term_scores = [
+            row[j] for j, term in enumerate(feature_names)
+            if term in entity_words or any(word in term for word in entity_words)
+        ]
+        avg_score = sum(term_scores) / len(term_scores) if term_scores else np.max(row)
+        frequency_boost = min(1.0, source_lower.count(entity.lower()) * 0.1)
+        scores[entity] = round(min(1.0, min(1.0, avg_score * 2) + frequency_boost * 0.2), 2)
+    
+    return scores
+
+
+FILLER = (
+    "the of and to in for on with said officials reported that was were has have "
+    "government minister talks agreement market economy week year after during "
+    "statement leaders press meeting city local national global policy"
+).split()
+
+CANDIDATES = {
+    "people": ["Angela Merkel", "Emmanuel Macron", "Olaf Scholz", "Giorgia Meloni", "Justin Trudeau", "Rishi Sunak"],
+    "locations": ["Paris", "Berlin", "Rome", "Madrid", "Tokyo", "Ottawa"],
+    "countries": ["France", "Germany", "Italy", "Spain", "Japan", "Canada"],
+    "events": ["Climate Summit", "World Economic Forum", "Trade Conference", "Film Festival"],
+    "dates": ["Monday", "Tuesday", "June 2023", "Friday"],
+}
+
+
+def make_articles(n: int, seed: int = 0) -> tuple:
+    """Generate articles with 1-4 entities per category, each mentioned 1-4 times."""
+    rng = random.Random(seed)
+    entity_dicts, texts = [], []
+    for _ in range(n):
+        entities = {
+            category: rng.sample(values, rng.randint(1, 4))
+            for category, values in CANDIDATES.items()
+        }
+        words = [rng.choice(FILLER) for _ in range(rng.randint(150, 300))]
+        for entity_list in entities.values():
+            for entity in entity_list:
+                for _ in range(rng.randint(1, 4)):
+                    words.insert(rng.randrange(len(words)), entity)
+        entity_dicts.append(entities)
+        texts.append(" ".join(words))
+    return entity_dicts, texts, [f"file:///news/{i}.pdf" for i in range(n)]
+
+
+def entity_scores(rectified: dict) -> dict:
+    return {
+        (category, entity["key"]): entity["value"]
+        for category, entity_list in rectified["entities"].items()
+        for entity in entity_list
+    }
+
+
+def test_rectify_matches_original_scores():
+    entity_dicts, texts, urls = make_articles(20)
+    rectifier = TFIDFRectifier()
+    
+    for entities, text, url in zip(entity_dicts, texts, urls):
+        expected = {
+            (category, entity): score
+            for category, entity_list in entities.items()
+            for entity, score in original_category_scores(entity_list, text).items()
+        }
+        
+        assert entity_scores(rectifier.rectify(entities, text, url, filter_low_relevance=False)) == expected
+
+
+def test_single_entity_category_uses_frequency_scoring():
+    text = "On Monday the minister met Angela Merkel and Olaf Scholz. Angela Merkel spoke first."
+    entities = {"people": ["Angela Merkel", "Olaf Scholz"], "dates": ["Monday"]}
+    
+    scores = entity_scores(TFIDFRectifier().rectify(entities, text, "u", filter_low_relevance=False))
+    
+    # The only date is pruned by max_df and falls back to frequency scoring,
+    # whatever the other categories contain
+    assert scores[("dates", "Monday")] == 1.0
+    assert scores[("people", "Angela Merkel")] == original_category_scores(entities["people"], text)["Angela Merkel"]
+
+
+def test_rectify_keeps_original_entities():
+    entity_dicts, texts, urls = make_articles(20, seed=1)
+    rectifier = TFIDFRectifier()
+    
+    for entities, text, url in zip(entity_dicts, texts, urls):
+        kept = set(entity_scores(rectifier.rectify(entities, text, url)))
+        expected = {
+            (category, entity)
+            for category, entity_list in entities.items()
+            for entity, score in original_category_scores(entity_list, text).items()
+            if score >= rectifier.min_relevance
+        }
+        
+        assert kept == expected
+
+
+@pytest.mark.parametrize("entities", [{}, {"people": []}, {"people": ["Nobody Here"], "places": []}])
+def test_empty_and_missing_entities(entities):
+    rectified = TFIDFRectifier().rectify(entities, "Some text without entities", "u", filter_low_relevance=False)
+    
+    assert rectified["url"] == "u"
+    assert set(rectified["entities"]) == set(entities)
+    assert all(
+        entity["value"] == 0.5
+        for entity_list in rectified["entities"].values()
+        for entity in entity_list
+    )
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_batch_rectify_keeps_about_the_same_entities_as_rectify(incremental):
+    entity_dicts, texts, urls = make_articles(30, seed=2)
+    rectifier = TFIDFRectifier()
+    
+    per_article = [
+        entity_scores(rectifier.rectify(entities, text, url, filter_low_relevance=False))
+        for entities, text, url in zip(entity_dicts, texts, urls)
+    ]
+    batch = [
+        entity_scores(rectified)
+        for rectified in TFIDFRectifier().batch_rectify(
+            entity_dicts, texts, urls, filter_low_relevance=False, incremental=incremental
+        )
+    ]
+    
+    # Corpus IDF shifts scores a little, but keeps them on the same scale
+    differences = [
+        abs(scores[key] - batch_scores[key])
+        for scores, batch_scores in zip(per_article, batch)
+        for key in scores
+    ]
+    assert max(differences) < 0.3
+    assert np.mean(differences) < 0.1
+    
+    kept = {(i, key) for i, scores in enumerate(per_article) for key, value in scores.items() if value >= 0.3}
+    batch_kept = {(i, key) for i, scores in enumerate(batch) for key, value in scores.items() if value >= 0.3}
+    assert len(kept ^ batch_kept) < 0.25 * len(kept)
+
+
+def test_batch_rectify_reuses_corpus_fit():
+    entity_dicts, texts, urls = make_articles(5)
+    rectifier = TFIDFRectifier()
+    
+    first = rectifier.batch_rectify(entity_dicts, texts, urls)
+    second = rectifier.batch_rectify(entity_dicts, texts, urls)
+    
+    assert first == second
+    assert len(rectifier._idf_cache) == 1
+
+
+def test_hashing_vectorizer_matches_default_tfidf():
+    _, texts, _ = make_articles(10, seed=3)
+    vectorizer = TfidfVectorizer(lowercase=True, analyzer='word', ngram_range=(1, 2))
+    hashing_vectorizer = HashingTfidfVectorizer()
+    
+    expected = vectorizer.fit_transform(texts)
+    hashed = hashing_vectorizer.fit_transform(texts)
+    
+    # Same TF weighting and IDF for every term without a hash collision
+    terms = vectorizer.get_feature_names_out()
+    columns = np.array([hashing_vectorizer.term_id(term) for term in terms])
+    unique = np.isin(columns, np.flatnonzero(np.bincount(columns) == 1))
+    assert unique.mean() > 0.99
+    assert np.allclose(hashing_vectorizer.idf(terms)[unique], vectorizer.idf_[unique])
+    assert np.allclose(
+        normalize(hashed[:, columns[unique]]).toarray(),
+        normalize(expected[:, unique]).toarray()
+    )
+
+
+def test_hashing_batch_rectify_matches_default():
+    entity_dicts, texts, urls = make_articles(20, seed=4)
+    
+    default = TFIDFRectifier().batch_rectify(entity_dicts, texts, urls, filter_low_relevance=False)
+    hashed = TFIDFRectifier(use_hashing=True).batch_rectify(entity_dicts, texts, urls, filter_low_relevance=False)
+    
+    # Equal up to hash collisions
+    for hashed_scores, default_scores in zip(map(entity_scores, hashed), map(entity_scores, default)):
+        assert hashed_scores.keys() == default_scores.keys()
+        assert all(abs(hashed_scores[key] - default_scores[key]) < 0.05 for key in default_scores)
@@ -0,0 +1,163 @@
+"""
+Tests for the in-process TTL/LRU cache
+"""
+
+import threading
+
+from src.utils.cache import TTLCache, cached, freeze
+
+
+class FakeClock:
+    """Replacement for time.monotonic that only moves when advanced."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_cache(monkeypatch, **kwargs) -> tuple:
+    clock = FakeClock()
+    monkeypatch.setattr("src.utils.cache.time.monotonic", clock)
+    return TTLCache(**kwargs), clock
+
+
+def test_get_returns_default_for_missing_key():
+    cache = TTLCache()
+    assert cache.get("missing") is None
+    assert cache.get("missing", 42) == 42
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = make_cache(monkeypatch, ttl_seconds=10)
+    cache.set("key", "value")
+    
+    clock.now += 9.9
+    assert cache.get("key") == "value"
+    
+    clock.now += 0.1
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_pop_and_clear_remove_entries():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    assert len(cache) == 1
+    
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_set_skips_store_after_invalidation():
+    cache = TTLCache()
+    generation = cache.generation
+    cache.clear()
+    
+    cache.set("key", "stale", generation=generation)
+    assert cache.get("key") is None
+    
+    cache.set("key", "fresh", generation=cache.generation)
+    assert cache.get("key") == "fresh"
+
+
+class Repository:
+    """Minimal owner of a cached method."""
+    
+    def __init__(self):
+        self._cache = TTLCache()
+        self.calls = 0
+        self.rows = {"a": [1, 2]}
+    
+    @cached("_cache", key=lambda self, name: name or None)
+    def load(self, name: str) -> list:
+        self.calls += 1
+        return list(self.rows.get(name, []))
+
+
+def test_cached_calls_method_once_per_key():
+    repository = Repository()
+    
+    assert repository.load("a") == [1, 2]
+    assert repository.load("a") == [1, 2]
+    assert repository.calls == 1
+    
+    repository.load("b")
+    assert repository.calls == 2
+
+
+def test_cached_bypasses_cache_for_none_key():
+    repository = Repository()
+    repository.load("")
+    repository.load("")
+    assert repository.calls == 2
+
+
+def test_cached_values_are_copied():
+    repository = Repository()
+    
+    first = repository.load("a")
+    first.append(3)
+    
+    assert repository.load("a") == [1, 2]
+    second = repository.load("a")
+    second.append(4)
+    assert repository.load("a") == [1, 2]
+
+
+def test_cached_does_not_store_result_of_read_racing_a_write():
+    repository = Repository()
+    started = threading.Event()
+    resume = threading.Event()
+    
+    original_get = repository.rows.get
+    
+    class SlowRows(dict):
+        def get(self, *args):
+            value = original_get(*args)
+            started.set()
+            resume.wait(5)
+            return value
+    
+    repository.rows = SlowRows(repository.rows)
+    reader = threading.Thread(target=repository.load, args=("a",))
+    reader.start()
+    started.wait(5)
+    
+    # A write lands (and invalidates the cache) while the read is in flight
+    repository.rows = {"a": [9]}
+    repository._cache.clear()
+    resume.set()
+    reader.join(5)
+    
+    assert repository.load("a") == [9]
+
+
+def test_freeze_is_hashable_and_order_independent_for_dicts_and_sets():
+    assert freeze({"b": [1, 2], "a": {"x": 1}}) == freeze({"a": {"x": 1}, "b": [1, 2]})
+    assert freeze({"terms": {"paris", "london", "rome"}}) == freeze({"terms": {"rome", "paris", "london"}})
+    assert freeze(frozenset({3, 1, 2})) == (1, 2, 3)
+    hash(freeze({"a": [{"b": {1, 2}}]}))
+
+
+def test_freeze_keeps_list_order():
+    assert freeze([1, 2]) != freeze([2, 1])